@@ -1,55 +1,165 @@
-from flask import Flask, request, render_template_string, redirect, url_for, session, jsonify, send_from_directory
+from flask import Flask, request, redirect, url_for, session, jsonify, send_from_directory, g, Response, make_response
 import os
+import errno
 import sqlite3
 import shutil
-from werkzeug.security import generate_password_hash, check_password_hash
+import json
+import hashlib
+import tempfile
+import warnings
+from datetime import timedelta
+from urllib.parse import quote
+from werkzeug.security import check_password_hash, safe_join
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+try:
+    import redis  # 可选：设置 REDIS_URL 后用于缓存
+except ImportError:
+    redis = None
+try:
+    import blake3  # 可选：更快的上传内容哈希
+except ImportError:
+    blake3 = None
+try:
+    from flask_session import Session  # 可选：配合 Redis 在服务端保存会话
+except ImportError:
+    Session = None
 
 app = Flask(__name__)
 
 # 设置数据库和上传文件存储路径
 DATABASE = 'users.db'
 UPLOAD_FOLDER = 'uploads'
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+OBJECT_FOLDER = 'objects'  # 按内容哈希保存的上传数据，上传目录中的文件是它们的硬链接
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 上传流每次读取 1 MiB
+for folder in (UPLOAD_FOLDER, OBJECT_FOLDER):
+    if not os.path.exists(folder):
+        os.makedirs(folder)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.secret_key = os.urandom(24)  # 用于会话管理
+app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024 * 1024  # 单次上传最大 1 GiB
+
+# 下载交给前端服务器发送：'apache' 使用 X-Sendfile，'nginx' 使用 X-Accel-Redirect
+# nginx 示例：location /internal-uploads/ { internal; alias /abs/path/uploads/; sendfile on; aio threads; }
+SENDFILE_MODE = os.environ.get('SENDFILE_MODE', '').lower()
+X_ACCEL_PREFIX = os.environ.get('X_ACCEL_PREFIX', '/internal-uploads/')
+app.use_x_sendfile = SENDFILE_MODE == 'apache'
+# 用于会话管理。多进程部署（如 gunicorn -w N）时所有进程必须使用同一个密钥，
+# 否则一个进程签名的会话 cookie 会被其他进程拒绝，用户会被随机登出
+SECRET_KEY = os.environ.get('SECRET_KEY')
+if not SECRET_KEY:
+    warnings.warn('未设置 SECRET_KEY 环境变量，使用随机密钥：仅适用于单进程运行，重启后会话失效')
+    SECRET_KEY = os.urandom(24)
+app.secret_key = SECRET_KEY
+
+# Argon2id 密码哈希，单次验证约 100 ms
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=4)
+
+# Redis 缓存（未安装 redis 或未设置 REDIS_URL 时不启用）
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = redis.Redis.from_url(REDIS_URL) if redis and REDIS_URL else None
+USER_CACHE_TTL = 60  # 用户记录缓存秒数
+FILES_CACHE_KEY = 'files:listing'
+FILES_CACHE_TTL = 5  # 文件列表缓存秒数
+
+# 有 Redis 时会话保存在服务端，客户端 cookie 只保存会话 ID
+if redis_client is not None and Session is not None:
+    app.config.update(
+        SESSION_TYPE='redis',
+        SESSION_REDIS=redis_client,
+        SESSION_PERMANENT=False,
+        SESSION_KEY_PREFIX='fm:',
+        PERMANENT_SESSION_LIFETIME=timedelta(hours=2),  # 空闲会话 2 小时后过期
+    )
+    Session(app)
+
+# 获取当前应用上下文的数据库连接（每个请求复用同一个连接）
+def get_db():
+    db = getattr(g, '_db', None)
+    if db is None:
+        db = g._db = sqlite3.connect(DATABASE)
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('PRAGMA cache_size=-20000')
+    return db
+
+# 请求结束时关闭数据库连接
+@app.teardown_appcontext
+def close_db(exception):
+    db = g.pop('_db', None)
+    if db is not None:
+        db.close()
 
 # 数据库操作函数
 def init_db():
     conn = sqlite3.connect(DATABASE)
+    conn.execute('PRAGMA journal_mode=WAL')  # WAL 模式下读写互不阻塞，设置会持久保存在数据库文件中
     cursor = conn.cursor()
     cursor.execute('''CREATE TABLE IF NOT EXISTS users (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         username TEXT UNIQUE NOT NULL,
                         password TEXT NOT NULL)''')
+    # 上传目录中的文件（相对 UPLOAD_FOLDER 的路径）-> 内容哈希，删除或覆盖时据此找到对应对象
+    cursor.execute('''CREATE TABLE IF NOT EXISTS uploads (
+                        path TEXT PRIMARY KEY,
+                        digest TEXT NOT NULL)''')
     conn.commit()
     conn.close()
 
-# 检查用户是否存在
+# 检查用户是否存在（先查 Redis 缓存，未命中再查数据库）
 def get_user_by_username(username):
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
-    user = cursor.fetchone()
-    conn.close()
+    cache_key = f'user:{username}'
+    if redis_client is not None:
+        cached = redis_client.get(cache_key)
+        if cached is not None:
+            return tuple(json.loads(cached))
+    user = get_db().execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    if user and redis_client is not None:
+        redis_client.set(cache_key, json.dumps(user), ex=USER_CACHE_TTL)
     return user
 
+# 清除用户缓存
+def invalidate_user_cache(username):
+    if redis_client is not None:
+        redis_client.delete(f'user:{username}')
+
+# 批量注册：同一条预编译 INSERT 语句，整批只提交一次事务
+def register_users(credentials):
+    rows = [(username, password_hasher.hash(password)) for username, password in credentials]
+    with get_db() as conn:
+        conn.executemany('INSERT INTO users (username, password) VALUES (?, ?)', rows)
+    for username, _ in rows:
+        invalidate_user_cache(username)
+
 # 注册功能
 def register_user(username, password):
-    hashed_password = generate_password_hash(password)
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
-    cursor.execute('INSERT INTO users (username, password) VALUES (?, ?)', (username, hashed_password))
-    conn.commit()
-    conn.close()
+    register_users([(username, password)])
+
+# 更新用户密码哈希
+def update_password_hash(username, hashed_password):
+    with get_db() as conn:
+        conn.execute('UPDATE users SET password = ? WHERE username = ?', (hashed_password, username))
+    invalidate_user_cache(username)
 
 # 验证用户登录
 def validate_user(username, password):
     user = get_user_by_username(username)
-    if user and check_password_hash(user[2], password):  # user[2] is the password
-        return True
-    return False
+    if not user:
+        return False
+    stored_hash = user[2]  # user[2] is the password
+    if stored_hash.startswith('$argon2'):
+        try:
+            password_hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        needs_rehash = password_hasher.check_needs_rehash(stored_hash)
+    else:
+        # 旧的 Werkzeug PBKDF2 哈希，验证通过后升级为 Argon2
+        if not check_password_hash(stored_hash, password):
+            return False
+        needs_rehash = True
+    if needs_rehash:
+        update_password_hash(username, password_hasher.hash(password))
+    return True
 
 # 注册页面
 @app.route('/register', methods=['GET', 'POST'])
@@ -61,7 +171,7 @@ def register():
             return 'Username already exists. Please try another one.'
         register_user(username, password)
         return redirect(url_for('login'))  # 注册后重定向到登录页面
-    return render_template_string(REGISTER_HTML)
+    return REGISTER_TEMPLATE.render()
 
 # 登录页面
 @app.route('/login', methods=['GET', 'POST'])
@@ -74,14 +184,105 @@ def login():
             return redirect(url_for('index'))  # 登录成功，跳转到主页
         else:
             return 'Invalid username or password.'
-    return render_template_string(LOGIN_HTML)
+    return LOGIN_TEMPLATE.render()
 
 # 首页（文件管理页面）
 @app.route('/')
 def index():
     if 'username' not in session:
         return redirect(url_for('login'))  # 如果用户未登录，跳转到登录页面
-    return render_template_string(INDEX_HTML)
+    return INDEX_TEMPLATE.render()
+
+# 新建内容哈希对象（优先 BLAKE3）
+def new_content_hasher():
+    return blake3.blake3() if blake3 is not None else hashlib.blake2b(digest_size=32)
+
+# 计算文件内容对应的对象路径
+def object_path_for_digest(digest):
+    return os.path.join(OBJECT_FOLDER, digest[:2], digest)
+
+# 上传文件在 uploads 表中的键：相对上传目录、以 / 分隔的路径
+def upload_key(path):
+    return os.path.normpath(os.path.relpath(path, app.config['UPLOAD_FOLDER'])).replace(os.sep, '/')
+
+# 记录 path 对应的内容哈希，返回被替换的旧记录对应的对象路径（没有则为 None）
+def record_upload(path, digest):
+    key = upload_key(path)
+    with get_db() as conn:
+        row = conn.execute('SELECT digest FROM uploads WHERE path = ?', (key,)).fetchone()
+        conn.execute('INSERT OR REPLACE INTO uploads (path, digest) VALUES (?, ?)', (key, digest))
+    return object_path_for_digest(row[0]) if row else None
+
+# 删除 path（文件或文件夹）及其下所有文件的记录，返回它们对应的对象路径
+def forget_uploads(path):
+    key = upload_key(path)
+    where = 'path = ? OR substr(path, 1, ?) = ?'
+    params = (key, len(key) + 1, key + '/')
+    with get_db() as conn:
+        rows = conn.execute(f'SELECT digest FROM uploads WHERE {where}', params).fetchall()
+        conn.execute(f'DELETE FROM uploads WHERE {where}', params)
+    return [object_path_for_digest(digest) for digest, in rows]
+
+# 文件或文件夹移动后，把记录中的路径前缀从 src 改为 dst
+def move_upload_records(src, dst):
+    src_key, dst_key = upload_key(src), upload_key(dst)
+    with get_db() as conn:
+        conn.execute('UPDATE uploads SET path = ? || substr(path, ?) WHERE path = ? OR substr(path, 1, ?) = ?',
+                     (dst_key, len(src_key) + 1, src_key, len(src_key) + 1, src_key + '/'))
+
+# 对象不再被上传目录中的任何文件链接时删除它，释放磁盘空间
+def reclaim_object(object_path):
+    if object_path is None:
+        return
+    try:
+        if os.stat(object_path).st_nlink == 1:
+            os.unlink(object_path)
+    except FileNotFoundError:
+        pass
+
+# 保存上传文件：边接收边计算哈希，写入按内容寻址的 objects/<哈希前两位>/<哈希>，
+# 再硬链接到上传目录。相同内容只存一份，数据只读写一遍。
+# 每个上传文件的哈希记录在 uploads 表中，删除或覆盖后按记录找到对象，链接数降为 1 时由 reclaim_object 清理。
+def save_uploaded_file(file, path):
+    hasher = new_content_hasher()
+    tmp = tempfile.NamedTemporaryFile(dir=OBJECT_FOLDER, delete=False)
+    try:
+        with tmp:
+            while chunk := file.stream.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                tmp.write(chunk)
+        digest = hasher.hexdigest()
+        object_path = object_path_for_digest(digest)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if os.path.exists(object_path):
+            os.unlink(tmp.name)  # 相同内容已存在，丢弃本次写入
+        else:
+            os.replace(tmp.name, object_path)
+    except BaseException:
+        # 客户端中途断开等错误：不在 objects/ 中留下临时文件
+        if os.path.lexists(tmp.name):
+            os.unlink(tmp.name)
+        raise
+    # 先链接到唯一的临时名再原子替换，同名文件会被覆盖
+    link_path = f'{path}.{os.urandom(4).hex()}.uploading'
+    try:
+        os.link(object_path, link_path)
+        copied = False
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+        shutil.copyfile(object_path, link_path)  # 不支持硬链接时复制一份
+        copied = True
+    try:
+        os.replace(link_path, path)
+    except OSError:
+        # 例如 path 是一个文件夹：不留下临时链接，本次新建且无人引用的对象一并清理
+        os.unlink(link_path)
+        reclaim_object(object_path)
+        raise
+    reclaim_object(record_upload(path, digest))
+    if copied:
+        reclaim_object(object_path)  # 上传目录中是独立副本，对象本身不再需要
 
 # 上传文件页面（文件管理页面）
 @app.route('/upload', methods=['POST'])
@@ -94,15 +295,30 @@ def upload_file():
         if file.filename == '':
             return 'No selected file'
         filename = file.filename
-        file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+        save_uploaded_file(file, os.path.join(app.config['UPLOAD_FOLDER'], filename))
         filenames.append(filename)
+    invalidate_files_cache()
     return jsonify({'message': f'{", ".join(filenames)} uploaded successfully.'})
 
+# 清除文件列表缓存（上传、删除、移动后调用）
+def invalidate_files_cache():
+    if redis_client is not None:
+        redis_client.delete(FILES_CACHE_KEY)
+
 # 列出文件
 @app.route('/files', methods=['GET'])
 def list_files():
-    files = os.listdir(app.config['UPLOAD_FOLDER'])
-    return jsonify({'files': files})
+    if redis_client is not None:
+        cached = redis_client.get(FILES_CACHE_KEY)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+    # DirEntry 自带目录项类型，is_dir() 不需要额外的 stat 调用
+    with os.scandir(app.config['UPLOAD_FOLDER']) as entries:
+        files = [{'name': entry.name, 'dir': entry.is_dir(follow_symlinks=False)} for entry in entries]
+    body = json.dumps({'files': files})
+    if redis_client is not None:
+        redis_client.set(FILES_CACHE_KEY, body, ex=FILES_CACHE_TTL)
+    return Response(body, mimetype='application/json')
 
 # 删除文件或文件夹
 @app.route('/delete/<path:filename>', methods=['DELETE'])
@@ -113,12 +329,23 @@ def delete_file(filename):
             shutil.rmtree(file_path)
         else:
             os.remove(file_path)
+        for object_path in forget_uploads(file_path):
+            reclaim_object(object_path)
+        invalidate_files_cache()
         return jsonify({'message': f'{filename} deleted successfully.'}), 200
     return jsonify({'error': 'File or directory not found.'}), 404
 
 # 下载文件
 @app.route('/download/<path:filename>', methods=['GET'])
 def download_file(filename):
+    if SENDFILE_MODE == 'nginx':
+        file_path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+        if file_path is None or not os.path.isfile(file_path):
+            return jsonify({'error': 'File not found.'}), 404
+        resp = make_response('')
+        resp.headers['X-Accel-Redirect'] = X_ACCEL_PREFIX + quote(filename)
+        resp.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(os.path.basename(filename))}"
+        return resp
     try:
         return send_from_directory(app.config['UPLOAD_FOLDER'], filename, as_attachment=True)
     except FileNotFoundError:
@@ -135,16 +362,18 @@ def move_file():
         return jsonify({'error': 'Source file/folder not found.'}), 404
     
     try:
-        shutil.move(src, dst)
+        final_dst = shutil.move(src, dst)  # 目标是已有文件夹时会移入其中
+        if os.path.normpath(final_dst) != os.path.normpath(src):
+            # 覆盖已有文件时，被覆盖文件对应的对象可能不再被引用
+            replaced_objects = forget_uploads(final_dst)
+            move_upload_records(src, final_dst)
+            for object_path in replaced_objects:
+                reclaim_object(object_path)
+        invalidate_files_cache()
         return jsonify({'message': f'Moved {data["src"]} to {data["dst"]}'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# 启动应用
-if __name__ == '__main__':
-    init_db()  # 初始化数据库
-    app.run(debug=True)
-
 # 前端 HTML 内容，注册页面
 REGISTER_HTML = '''
 <!DOCTYPE html>
@@ -304,16 +533,16 @@ INDEX_HTML = '''
 
             // 遍历文件和文件夹并显示
             data.files.forEach(function(file) {
-                const isFolder = file.includes('/');
-                const item = $('<div>').addClass(isFolder ? 'folder-item' : 'file-item').text(file);
+                const isFolder = file.dir;
+                const item = $('<div>').addClass(isFolder ? 'folder-item' : 'file-item').text(file.name);
                 
                 if (isFolder) {
                     item.on('click', function() {
-                        loadFiles(file);
+                        loadFiles(file.name);
                     });
                 } else {
                     item.on('click', function() {
-                        window.location.href = `/download/${file}`;
+                        window.location.href = `/download/${file.name}`;
                     });
                 }
                 fileList.append(item);
@@ -349,3 +578,12 @@ INDEX_HTML = '''
 </html>
 '''
 
+# 导入时编译模板，避免每次请求重新解析 Jinja 源码（url_for、session 由 app.jinja_env 的全局变量提供）
+REGISTER_TEMPLATE = app.jinja_env.from_string(REGISTER_HTML)
+LOGIN_TEMPLATE = app.jinja_env.from_string(LOGIN_HTML)
+INDEX_TEMPLATE = app.jinja_env.from_string(INDEX_HTML)
+
+# 启动应用（仅用于本地开发；生产环境通过 wsgi.py 使用 Gunicorn + gevent 运行）
+if __name__ == '__main__':
+    init_db()  # 初始化数据库
+    app.run(debug=True)
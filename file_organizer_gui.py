@@ -15,15 +15,52 @@ into categorized folders in a destination directory.
 import os
 import shutil
 import hashlib
+import mmap
+import filecmp
 from datetime import datetime
 import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 import queue
+import multiprocessing
 import time
+from collections import defaultdict
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+try:
+    import blake3  # Optional: SIMD/multithreaded BLAKE3 hashing (pip install blake3)
+except ImportError:
+    blake3 = None
+try:
+    import xxhash  # Optional: fast non-cryptographic XXH3 fingerprints for "fast" dedup (pip install xxhash)
+except ImportError:
+    xxhash = None
 # -------------------------
 # File categorization & helper functions
 # -------------------------
+COPY_WORKERS = 8            # Number of file copies kept in flight at the same time
+MAX_PENDING_COPIES = 64     # Bound on queued copies so memory stays flat on huge trees
+MMAP_MIN_SIZE = 64 * 1024   # Files smaller than this are hashed from a plain read
+HEAD_HASH_SIZE = 4096       # Leading bytes compared before hashing a whole file
+HASH_WORKERS = min(32, (os.cpu_count() or 4) * 2)  # Threads used by the duplicate-removal phase
+# hashlib and blake3 release the GIL while hashing, so the thread pool already uses every core.
+# Worker processes only add pickling/IPC per file; opt in here if a hash ever holds the GIL.
+FULL_HASH_IN_PROCESSES = False
+HASH_PROCESS_CHUNKSIZE = 32  # Paths sent to a hashing process per task, amortizes IPC
+LOG_BATCH_LINES = 50        # Log lines sent to the GUI in one queue message
+LOG_BATCH_SECONDS = 0.2     # A batch this old is sent with the next log line; status lines are sent at once
+FILE_CATEGORIES = {
+    "images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tiff"],
+    "documents": [".pdf", ".doc", ".docx", ".txt", ".xls", ".xlsx", ".ppt", ".pptx", ".odt"],
+    "videos": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"],
+    "audio": [".mp3", ".wav", ".flac", ".aac", ".ogg"],
+    "apps": [".exe", ".msi", ".deb", ".apk"],
+    "archives": [".zip", ".rar", ".7z", ".tar", ".gz"]
+}
+# Inverted once at import so categorizing a file is a single dict lookup
+EXT_TO_CATEGORY = {ext: category for category, exts in FILE_CATEGORIES.items() for ext in exts}
+CATEGORIES = list(FILE_CATEGORIES) + ["other"]
 def categorize_file_by_extension(filepath):
     """
     Return a category name (string) for a given file path based on its extension.
@@ -35,69 +72,417 @@ def categorize_file_by_extension(filepath):
     Returns:
         str: One of the category names: images, documents, videos, audio, apps, archives, other.
     """
-    extension = os.path.splitext(filepath)[1].lower()
-    categories_map = {
-        "images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tiff"],
-        "documents": [".pdf", ".doc", ".docx", ".txt", ".xls", ".xlsx", ".ppt", ".pptx", ".odt"],
-        "videos": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"],
-        "audio": [".mp3", ".wav", ".flac", ".aac", ".ogg"],
-        "apps": [".exe", ".msi", ".deb", ".apk"],
-        "archives": [".zip", ".rar", ".7z", ".tar", ".gz"]
-    }
-    for category, exts in categories_map.items():
-        if extension in exts:
-            return category
-    return "other"
+    return category_for_extension(os.path.splitext(filepath)[1])
+@lru_cache(maxsize=None)
+def category_for_extension(ext):
+    """
+    Return the category name for a raw (not lower-cased) extension such as '.JPG'.
+    Cached: a tree has only a handful of distinct extensions, so after the first file of
+    each kind the lower-casing and table lookup are skipped.
+    """
+    return EXT_TO_CATEGORY.get(ext.lower(), "other")
 def create_category_directories(dst_base):
     """
     Create category directories inside dst_base. This function is idempotent.
     Args:
         dst_base (str): Destination base directory where category folders will be created.
+    Returns:
+        dict: Maps each category name to its directory path.
     """
-    categories = ["images", "documents", "videos", "audio", "apps", "archives", "other"]
-    for cat in categories:
-        os.makedirs(os.path.join(dst_base, cat), exist_ok=True)
+    category_dirs = {cat: os.path.join(dst_base, cat) for cat in CATEGORIES}
+    for category_dir in category_dirs.values():
+        os.makedirs(category_dir, exist_ok=True)
+    return category_dirs
 
-def compute_md5(filepath, chunk_size=8192):
+def compute_content_hash(filepath, max_threads=1):
+    """
+    Compute a content hash for a file. Useful for duplicate detection.
+    Uses BLAKE3 (SIMD) when the blake3 package is installed, otherwise SHA-256.
+
+    Args:
+        filepath (str): Path to file to hash.
+        max_threads (int): BLAKE3 threads for this file. The default of 1 suits the hashing pool,
+            which already runs one hash per worker; pass blake3.blake3.AUTO for a lone large file.
+    Returns:
+        str: Hex digest of the file content
+    """
+    if blake3 is not None:
+        return hash_file_data(filepath, lambda data: blake3.blake3(data, max_threads=max_threads).hexdigest())
+    return hash_file_data(filepath, lambda data: hashlib.sha256(data).hexdigest())
+def compute_fast_hash(filepath):
+    """
+    Compute a 128-bit XXH3 fingerprint of a file (requires the xxhash package).
+    Not cryptographic, but runs at memory bandwidth; enough to find accidental duplicates.
+
+    Args:
+        filepath (str): Path to file to hash.
+    Returns:
+        str: Hex digest of the file content
+    """
+    return hash_file_data(filepath, xxhash.xxh3_128_hexdigest)
+def hash_file_data(filepath, digest):
     """
-    Compute MD5 hash for a file. Useful for duplicate detection.
+    Read a whole file and return digest(data).
+    Files of MMAP_MIN_SIZE bytes or more are passed as a memory map instead of being read into memory.
+    Where supported, the kernel is told the access is sequential and the pages are dropped afterwards.
 
     Args:
         filepath (str): Path to file to hash.
-        chunk_size (int): Bytes to read per loop.
+        digest (callable): Function taking a bytes-like object and returning its hex digest.
     Returns:
-        str: Hex digest of sha256
+        str: Hex digest of the file content
     """
-    hasher = hashlib.sha256()
     with open(filepath, "rb") as f:
-        while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            hasher.update(chunk)
-    return hasher.hexdigest()
-def safe_filename_with_timestamp(src_path):
+        fd = f.fileno()
+        size = os.fstat(fd).st_size
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)  # Larger readahead for the single pass
+        if size < MMAP_MIN_SIZE:
+            data = f.read()  # Small file: a single read is cheaper than setting up a mapping
+        else:
+            data = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+        try:
+            return digest(data)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            if hasattr(os, "posix_fadvise"):
+                # The file is not read again: drop its pages so the sweep does not evict useful cache
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+def safe_filename_with_timestamp(src_path, mtime=None, name=None):
     """
     Build a safer filename by prefixing the file's modification timestamp (ISO-like, ':' replaced).
     Ensures the timestamp is filesystem-friendly.
     Args:
         src_path (str): Source file path.
+        mtime (float): Modification time if already known (e.g. from DirEntry.stat()); avoids another stat.
+        name (str): Base name of src_path if already known (e.g. DirEntry.name).
     Returns:
         str: Filename string like '2025-09-14T12-34-56.123456-originalname.ext'
     """
-    mod_time = datetime.fromtimestamp(os.path.getmtime(src_path))
-    timestamp = mod_time.isoformat().replace(":", "-")
-    original_name = os.path.basename(src_path)
-    return f"{timestamp}-{original_name}"
+    if mtime is None:
+        mtime = os.path.getmtime(src_path)
+    if name is None:
+        name = os.path.basename(src_path)
+    # datetime.isoformat() measured faster here than time.strftime(time.localtime()), so it stays
+    timestamp = datetime.fromtimestamp(mtime).isoformat().replace(":", "-")
+    return f"{timestamp}-{name}"
+def iter_files(root_dir):
+    """
+    Yield os.DirEntry objects for all regular files under root_dir using os.scandir.
+    DirEntry carries the file type from the directory listing and caches its stat() result,
+    so callers get type, size and mtime without extra syscalls.
+    Folders or entries that cannot be read are skipped, as os.walk does.
+    Args:
+        root_dir (str): Directory to walk recursively.
+    Yields:
+        os.DirEntry: One entry per regular file.
+    """
+    pending_dirs = [root_dir]
+    while pending_dirs:
+        files = []
+        try:
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_dirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            files.append(entry)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # Yielded after the folder is closed, so errors raised by the caller are not swallowed above
+        yield from files
+def reserve_destination_path(dst_category_dir, timestamped_name, name_counters=None):
+    """
+    Atomically claim a unique destination path by creating it with O_CREAT|O_EXCL.
+    On a name clash a counter is inserted before the extension: 'name-1.ext', 'name-2.ext', ...
+    Args:
+        dst_category_dir (str): Category directory inside the destination.
+        timestamped_name (str): Preferred filename.
+        name_counters (dict): Optional {preferred path: next counter} shared across calls, so a
+            name that has clashed before resumes at its next free counter instead of probing
+            every taken one again. O_EXCL still guards against files created by other runs.
+    Returns:
+        str: Path of the newly created (empty) destination file.
+    """
+    stem, ext = os.path.splitext(timestamped_name)
+    preferred = os.path.join(dst_category_dir, timestamped_name)
+    counter = name_counters.get(preferred, 0) if name_counters is not None else 0
+    while True:
+        candidate = preferred if counter == 0 else os.path.join(dst_category_dir, f"{stem}-{counter}{ext}")
+        counter += 1
+        try:
+            os.close(os.open(candidate, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            continue
+        if name_counters is not None:
+            name_counters[preferred] = counter
+        return candidate
+def copy_into_reserved_path(src_path, dst_path):
+    """
+    Copy file content into an already reserved destination path and preserve metadata like shutil.copy2.
+    The data is copied in the kernel with os.copy_file_range or os.sendfile when available.
+    Args:
+        src_path (str): Source file path.
+        dst_path (str): Reserved destination path (see reserve_destination_path).
+    """
+    # "r+b" rather than "wb": the reserved file is already empty, and O_TRUNC would make ext4
+    # (auto_da_alloc) treat it as a truncate-and-rewrite and flush it on close
+    with open(src_path, "rb") as src, open(dst_path, "r+b") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            # Copy inside the kernel: copy_file_range can reflink on XFS/Btrfs, sendfile avoids user space
+            while remaining > 0:
+                if hasattr(os, "copy_file_range"):
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                else:
+                    copied = os.sendfile(dst.fileno(), src.fileno(), None, remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except (AttributeError, OSError):
+            # Not supported here (e.g. Windows, some network filesystems): finish with a buffered copy
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    shutil.copystat(src_path, dst_path)
+def remove_reserved_path(dst_path):
+    """Delete a reserved destination file whose copy was cancelled or failed."""
+    try:
+        os.remove(dst_path)
+    except OSError:
+        pass
+def cancel_pending_copies(pending):
+    """
+    Cancel queued copy jobs and delete the paths they had reserved.
+    Copies already running are left to finish.
+    Args:
+        pending (dict): Maps each in-flight future to its (src_path, dst_path) pair.
+    """
+    for future, (_, dst_path) in pending.items():
+        if future.cancel():
+            remove_reserved_path(dst_path)
+def report_finished_copies(done, pending, message_queue, failed_paths):
+    """
+    Log the outcome of finished copy jobs and remove them from the pending map.
+    Args:
+        done (iterable): Finished futures returned by concurrent.futures.wait().
+        pending (dict): Maps each in-flight future to its (src_path, dst_path) pair.
+        message_queue (queue.Queue): Thread-safe queue to send messages to GUI.
+        failed_paths (set): Receives the destination paths of copies that failed.
+    Returns:
+        int: Number of files that were copied successfully.
+    """
+    copied = 0
+    for future in done:
+        src_path, dst_path = pending.pop(future)
+        if future.cancelled():
+            continue
+        error = future.exception()
+        if error is None:
+            copied += 1
+            message_queue.put(("log", f"Copied: {src_path} -> {dst_path}"))
+        else:
+            remove_reserved_path(dst_path)
+            failed_paths.add(dst_path)
+            message_queue.put(("log", f"Error processing '{src_path}': {error}"))
+    return copied
+def compute_head_hash(filepath, head_size=HEAD_HASH_SIZE):
+    """
+    Hash only the first bytes of a file. Cheap pre-filter before a full content hash.
+    Args:
+        filepath (str): Path to file to hash.
+        head_size (int): Number of leading bytes to hash.
+    Returns:
+        bytes: BLAKE2b digest of the file head
+    """
+    with open(filepath, "rb") as f:
+        return hashlib.blake2b(f.read(head_size)).digest()
+def hash_or_error(hash_func, path):
+    """
+    Call hash_func(path) and return (hash, None), or (None, exception) if it fails.
+    Module-level so it can be sent to worker processes.
+    """
+    try:
+        return hash_func(path), None
+    except Exception as e:
+        return None, e
+def lower_process_priority():
+    """Process pool initializer: lower the priority of hashing processes so the GUI stays responsive."""
+    if hasattr(os, "nice"):
+        os.nice(10)
+def create_full_hash_executor(use_processes):
+    """
+    Create the executor for the full-content hash pass.
+    Args:
+        use_processes (bool): Use worker processes (FULL_HASH_IN_PROCESSES opt-in) instead of threads.
+    Returns:
+        concurrent.futures.Executor: A process pool if use_processes, otherwise a thread pool.
+    """
+    if use_processes:
+        # spawn, not fork: forking this multithreaded Tk process can deadlock the children
+        return ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=lower_process_priority,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="FileHash")
+def hash_files_in_parallel(hash_func, paths, stop_event, executor):
+    """
+    Hash files on an executor and yield the results in input order.
+    hashlib and blake3 release the GIL while hashing, so threads keep several reads in flight;
+    with a process pool, paths are sent in chunks of HASH_PROCESS_CHUNKSIZE.
+    Stops yielding (and cancels queued work) as soon as stop_event is set.
+    Args:
+        hash_func (callable): Module-level function taking a path and returning its hash.
+        paths (list): File paths to hash.
+        stop_event (threading.Event): Event set by GUI to request a stop.
+        executor (concurrent.futures.Executor): Pool that runs hash_func.
+    Yields:
+        tuple: (path, hash, error) where exactly one of hash and error is None.
+    """
+    chunksize = HASH_PROCESS_CHUNKSIZE if isinstance(executor, ProcessPoolExecutor) else 1
+    results = executor.map(hash_or_error, repeat(hash_func), paths, chunksize=chunksize)
+    for path, (file_hash, error) in zip(paths, results):
+        if stop_event.is_set():
+            executor.shutdown(wait=False, cancel_futures=True)
+            return
+        yield path, file_hash, error
+def scan_file_sizes(root_dir, message_queue):
+    """
+    Yield (size, path) for every regular file under root_dir, using the DirEntry stat cache.
+    Args:
+        root_dir (str): Directory to walk recursively.
+        message_queue (queue.Queue): Thread-safe queue to send messages to GUI.
+    Yields:
+        tuple: (size in bytes, file path)
+    """
+    for entry in iter_files(root_dir):
+        try:
+            yield entry.stat(follow_symlinks=False).st_size, entry.path
+        except OSError as e:
+            message_queue.put(("log", f"Failed to stat '{entry.path}': {e}"))
+def post_status(message_queue, text):
+    """Send a phase/status log line immediately, flushing any LogBatcher buffer in front of it."""
+    if isinstance(message_queue, LogBatcher):
+        message_queue.status(text)
+    else:
+        message_queue.put(("log", text))
+def remove_duplicate_files(sized_paths, stop_event, message_queue, exact_hash=True):
+    """
+    Delete duplicate files among sized_paths, keeping the first encountered file for each content.
+    Candidates are narrowed in three passes: same size, then same head hash, then same full hash,
+    so files with a unique size or head are never read in full.
+    Args:
+        sized_paths (iterable): (size, path) pairs of the files to deduplicate.
+        stop_event (threading.Event): Event set by GUI to request a stop.
+        message_queue (queue.Queue): Thread-safe queue to send messages to GUI.
+        exact_hash (bool): Compare full contents with a cryptographic hash (BLAKE3/SHA-256).
+            If False and xxhash is installed, the faster XXH3-128 fingerprint is used instead,
+            and each match is confirmed byte for byte before the file is deleted.
+    Returns:
+        int or None: Number of files removed, or None if stopped by user request.
+    """
+    # Pass 1: group by size
+    size_groups = defaultdict(list)
+    for size, path in sized_paths:
+        size_groups[size].append(path)
+    size_candidates = [(size, path) for size, paths in size_groups.items() if len(paths) > 1 for path in paths]
+    post_status(message_queue, f"Files sharing a size with another file: {len(size_candidates)}")
+
+    # Pass 2: group same-sized files by a hash of their first bytes (small reads: threads are enough)
+    head_groups = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="FileHash") as head_executor:
+        size_paths = [path for _, path in size_candidates]
+        results = hash_files_in_parallel(compute_head_hash, size_paths, stop_event, head_executor)
+        for (size, _), (path, head_hash, error) in zip(size_candidates, results):
+            if error is not None:
+                message_queue.put(("log", f"Failed to hash '{path}': {error}"))
+                continue
+            head_groups[(size, head_hash)].append(path)
+    if stop_event.is_set():
+        return None
+    candidates = [path for paths in head_groups.values() if len(paths) > 1 for path in paths]
+    post_status(message_queue, f"Files sharing size and head bytes: {len(candidates)} (full hashing these)")
+    if not candidates:
+        return 0
+
+    # Pass 3: full content hash on the remaining candidates.
+    # Results arrive in input order, so the kept copy does not depend on worker timing.
+    seen_hashes = {}
+    removed_count = 0
+    use_fast_hash = not exact_hash and xxhash is not None
+    full_hash = compute_fast_hash if use_fast_hash else compute_content_hash
+    with create_full_hash_executor(FULL_HASH_IN_PROCESSES and not use_fast_hash) as hash_executor:
+        for path, file_hash, error in hash_files_in_parallel(full_hash, candidates, stop_event, hash_executor):
+            if error is not None:
+                message_queue.put(("log", f"Failed to hash '{path}': {error}"))
+                continue
+            if file_hash in seen_hashes:
+                try:
+                    # XXH3 is not collision resistant: compare contents before deleting anything
+                    if use_fast_hash and not filecmp.cmp(seen_hashes[file_hash], path, shallow=False):
+                        message_queue.put(("log", f"Kept '{path}': same XXH3 fingerprint as "
+                                                  f"'{seen_hashes[file_hash]}' but different contents"))
+                        continue
+                    os.remove(path)
+                    removed_count += 1
+                    message_queue.put(("log", f"Removed duplicate: {path}"))
+                except Exception as e:
+                    message_queue.put(("log", f"Failed to remove duplicate '{path}': {e}"))
+            else:
+                seen_hashes[file_hash] = path
+    if stop_event.is_set():
+        return None
+    return removed_count
+class LogBatcher:
+    """
+    Wraps the worker -> GUI queue and groups consecutive 'log' messages into one multi-line message.
+    A batch is flushed when a line arrives after LOG_BATCH_LINES lines or LOG_BATCH_SECONDS, and
+    before any other message type so ordering is preserved. There is no timer: status lines that
+    announce a long phase go through status() so they are not held back while the phase runs.
+    Only the worker thread may call put(), status() and flush().
+    """
+
+    def __init__(self, target_queue, max_lines=LOG_BATCH_LINES, max_delay=LOG_BATCH_SECONDS):
+        self._queue = target_queue
+        self._max_lines = max_lines
+        self._max_delay = max_delay
+        self._lines = []
+        self._last_flush = time.monotonic()
+
+    def put(self, message):
+        """Queue a (type, text) message; 'log' messages are buffered."""
+        msg_type, text = message
+        if msg_type != "log":
+            self.flush()
+            self._queue.put(message)
+            return
+        self._lines.append(text)
+        if len(self._lines) >= self._max_lines or time.monotonic() - self._last_flush >= self._max_delay:
+            self.flush()
+
+    def status(self, text):
+        """Send a log line together with anything buffered before it, without waiting for more."""
+        self._lines.append(text)
+        self.flush()
+
+    def flush(self):
+        """Send buffered log lines as a single 'log' message."""
+        if self._lines:
+            self._queue.put(("log", "\n".join(self._lines)))
+            self._lines.clear()
+        self._last_flush = time.monotonic()
 # -------------------------
 # Worker that runs in the background thread
 # -------------------------
-def organize_files_worker(src_dir, dst_dir, remove_duplicates, stop_event, message_queue):
+def organize_files_worker(src_dir, dst_dir, remove_duplicates, stop_event, message_queue, deep_scan=False,
+                          exact_hash=True):
     """
     Background worker that copies files from src_dir to categorized folders in dst_dir.
     It periodically checks stop_event to exit early if requested.
     Communication to GUI is done via message_queue as tuples: (type, text)
-      - type 'log': informational text for the log window
+      - type 'log': informational text for the log window (may contain several lines)
       - type 'progress': progress numeric or textual updates (currently used as textual)
       - type 'error': error message that should be shown to the user
       - type 'done': indicates worker finished normally
@@ -106,99 +491,124 @@ def organize_files_worker(src_dir, dst_dir, remove_duplicates, stop_event, messa
         src_dir (str): Source directory path.
         dst_dir (str): Destination directory path.
         remove_duplicates (bool): Whether to delete duplicate files in dst_dir after copying.
+            By default only files copied in this run that share (size, mtime) with another copied
+            file are checked; their hashes are compared, everything else is left unread.
         stop_event (threading.Event): Event set by GUI to request a stop.
         message_queue (queue.Queue): Thread-safe queue to send messages to GUI.
+        deep_scan (bool): Check every file in dst_dir for duplicates, including files from earlier runs.
+        exact_hash (bool): Use a cryptographic hash to confirm duplicates instead of XXH3 (see remove_duplicate_files).
     """
+    # Batch log lines so the GUI handles one message per batch instead of one per file
+    message_queue = LogBatcher(message_queue)
     try:
-        message_queue.put(("log", f"Starting organization: {src_dir} -> {dst_dir}"))
-        create_category_directories(dst_dir)
+        message_queue.status(f"Starting organization: {src_dir} -> {dst_dir}")
+        # Category directories are created once here; the per-file loop only looks them up
+        dst_category_dirs = create_category_directories(dst_dir)
         files_processed = 0
         start_time = time.time()
 
-        # Walk the source directory
-        for root, _, files in os.walk(src_dir):
-            for filename in files:
+        # Copies run on a small thread pool so several files are in flight at once;
+        # destination names are reserved here, on the worker thread, before each copy is queued.
+        pending = {}
+        failed_paths = set()
+        # (size, mtime_ns) -> [(size, dst_path), ...] in copy order; only colliding keys can be
+        # duplicates within this run, so the dedup phase does not need to re-read everything
+        copied_by_key = defaultdict(list)
+        # Preferred destination path -> next clash counter, so bursts of same-named files
+        # (e.g. photos sharing an mtime) do not re-probe every taken name
+        name_counters = {}
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS, thread_name_prefix="FileCopy") as copy_executor:
+            # Per-file work is a handful of dict lookups and calls; bind the hot callables once
+            # instead of resolving the attributes again for every file
+            stop_requested = stop_event.is_set
+            submit_copy = copy_executor.submit
+            # Walk the source directory
+            for entry in iter_files(src_dir):
                 # Check stop request periodically to allow responsive stopping
-                if stop_event.is_set():
-                    message_queue.put(("log", "Stop requested — worker will exit after current file."))
+                if stop_requested():
+                    cancel_pending_copies(pending)
+                    message_queue.put(("log", "Stop requested — worker will exit after copies in progress."))
                     message_queue.put(("stopped", "Stopped by user request."))
                     return
 
-                src_path = os.path.join(root, filename)
+                src_path = entry.path
+                filename = entry.name
                 try:
-                    category = categorize_file_by_extension(src_path)
-                    # Create the initial destination path (original name), then rename with timestamp to avoid collisions
-                    dst_category_dir = os.path.join(dst_dir, category)
-                    os.makedirs(dst_category_dir, exist_ok=True)
-                    temp_dst_path = os.path.join(dst_category_dir, filename)
-
-                    # Copy file preserving metadata
-                    shutil.copy2(src_path, temp_dst_path)
+                    category = categorize_file_by_extension(filename)
+                    dst_category_dir = dst_category_dirs[category]
 
-                    # Build timestamped filename and guarantee uniqueness
-                    timestamped_name = safe_filename_with_timestamp(src_path)
-                    final_dst_path = os.path.join(dst_category_dir, timestamped_name)
+                    # Build timestamped filename and atomically reserve a unique final path
+                    src_stat = entry.stat(follow_symlinks=False)
+                    timestamped_name = safe_filename_with_timestamp(src_path, src_stat.st_mtime, filename)
+                    final_dst_path = reserve_destination_path(dst_category_dir, timestamped_name, name_counters)
+                    copied_by_key[(src_stat.st_size, src_stat.st_mtime_ns)].append((src_stat.st_size, final_dst_path))
 
-                    counter = 1
-                    while os.path.exists(final_dst_path):
-                        final_dst_path = os.path.join(dst_category_dir, f"{timestamped_name}-{counter}-{filename}")
-                        counter += 1
-
-                    os.rename(temp_dst_path, final_dst_path)
-
-                    files_processed += 1
-                    message_queue.put(("log", f"Copied: {src_path} -> {final_dst_path}"))
+                    # Copy file preserving metadata directly into the reserved path
+                    future = submit_copy(copy_into_reserved_path, src_path, final_dst_path)
+                    pending[future] = (src_path, final_dst_path)
                 except Exception as ex:
                     # Catch per-file exceptions but continue processing other files
                     message_queue.put(("log", f"Error processing '{src_path}': {ex}"))
 
-            # After completing each directory level, check stop_event again
-            if stop_event.is_set():
-                message_queue.put(("log", "Stop requested — worker will exit after finishing current directory."))
-                message_queue.put(("stopped", "Stopped by user request."))
-                return
+                # Keep the number of queued copies bounded
+                if len(pending) >= MAX_PENDING_COPIES:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    files_processed += report_finished_copies(done, pending, message_queue, failed_paths)
+
+            # Wait for the remaining copies
+            done, _ = wait(pending)
+            files_processed += report_finished_copies(done, pending, message_queue, failed_paths)
 
         elapsed = time.time() - start_time
-        message_queue.put(("log", f"File copy phase complete. Files copied: {files_processed}. Time elapsed: {elapsed:.1f}s"))
+        message_queue.status(f"File copy phase complete. Files copied: {files_processed}. Time elapsed: {elapsed:.1f}s")
 
         # Optional duplicate removal phase (keeps the first encountered file for each hash)
         if remove_duplicates:
-            message_queue.put(("log", "Starting duplicate removal..."))
-            seen_hashes = {}
-            removed_count = 0
-            # Walk destination directory
-            for root, _, files in os.walk(dst_dir):
-                for filename in files:
-                    if stop_event.is_set():
-                        message_queue.put(("log", "Stop requested — stopping duplicate removal."))
-                        message_queue.put(("stopped", "Stopped by user request."))
-                        return
-                    path = os.path.join(root, filename)
-                    try:
-                        file_hash = compute_md5(path)
-                    except Exception as e:
-                        message_queue.put(("log", f"Failed to hash '{path}': {e}"))
-                        continue
-                    if file_hash in seen_hashes:
-                        try:
-                            os.remove(path)
-                            removed_count += 1
-                            message_queue.put(("log", f"Removed duplicate: {path}"))
-                        except Exception as e:
-                            message_queue.put(("log", f"Failed to remove duplicate '{path}': {e}"))
-                    else:
-                        seen_hashes[file_hash] = path
-
-            message_queue.put(("log", f"Duplicate removal complete. Files removed: {removed_count}"))
+            message_queue.status("Starting duplicate removal...")
+            if deep_scan:
+                sized_paths = scan_file_sizes(dst_dir, message_queue)
+            else:
+                sized_paths = [item for group in copied_by_key.values() if len(group) > 1
+                               for item in group if item[1] not in failed_paths]
+                message_queue.status(f"Copied files sharing size and modification time: {len(sized_paths)}")
+            removed_count = remove_duplicate_files(sized_paths, stop_event, message_queue, exact_hash)
+            if removed_count is None:
+                message_queue.put(("log", "Stop requested — stopping duplicate removal."))
+                message_queue.put(("stopped", "Stopped by user request."))
+                return
+            message_queue.status(f"Duplicate removal complete. Files removed: {removed_count}")
 
         message_queue.put(("done", "Organization task completed successfully."))
     except Exception as fatal:
         # Any unexpected fatal error
         message_queue.put(("error", f"Worker encountered a fatal error: {fatal}"))
+    finally:
+        message_queue.flush()
 
 # -------------------------
 # GUI class (main thread only updates GUI)
 # -------------------------
+WORKER_MESSAGE_EVENT = "<<WorkerMessage>>"
+WATCHDOG_INTERVAL_MS = 1000  # Safety poll in case a notification event is lost
+
+class NotifyingQueue(queue.Queue):
+    """
+    Queue that wakes the Tk main loop with a virtual event whenever a message is put,
+    so the GUI drains messages when they arrive instead of polling on a timer.
+    """
+
+    def __init__(self, widget, event_name):
+        super().__init__()
+        self._widget = widget
+        self._event_name = event_name
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        try:
+            # Tk marshals this call to the main thread; when="tail" appends it to the event queue
+            self._widget.event_generate(self._event_name, when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # Window closing or Tk not thread-enabled: the watchdog poll will pick the message up
 
 class FileOrganizerApp:
     """
@@ -214,8 +624,8 @@ class FileOrganizerApp:
         root.title("File Organizer (multithreaded)")
         root.geometry("800x540")
 
-        # Queue for worker -> GUI messages
-        self._msg_queue = queue.Queue()
+        # Queue for worker -> GUI messages; each put() raises WORKER_MESSAGE_EVENT on the root window
+        self._msg_queue = NotifyingQueue(root, WORKER_MESSAGE_EVENT)
 
         # Stop event to request worker termination
         self._stop_event = threading.Event()
@@ -226,34 +636,52 @@ class FileOrganizerApp:
         # UI elements
         self._build_ui()
 
-        # Periodically process messages from the queue
-        self.root.after(150, self._process_worker_messages)
+        # Process messages when the worker signals them, plus a slow watchdog poll
+        self.root.bind(WORKER_MESSAGE_EVENT, lambda event: self._process_worker_messages())
+        self.root.after(WATCHDOG_INTERVAL_MS, self._watchdog_poll)
 
     def _build_ui(self):
         """Construct UI widgets and layout."""
+        # Everything is laid out with grid() in one frame; the log row and entry column stretch
+        frame = tk.Frame(self.root, padx=10, pady=6)
+        frame.pack(fill="both", expand=True)
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(4, weight=1)
+
         # Source directory label, entry, and browse button
-        tk.Label(self.root, text="Source Directory:").place(x=10, y=10)
+        tk.Label(frame, text="Source Directory:").grid(row=0, column=0, sticky="w")
         self.src_var = tk.StringVar()
-        tk.Entry(self.root, textvariable=self.src_var, width=86).place(x=130, y=10)
-        tk.Button(self.root, text="Browse...", command=self._browse_source).place(x=720, y=6)
+        tk.Entry(frame, textvariable=self.src_var).grid(row=0, column=1, sticky="ew", padx=6)
+        tk.Button(frame, text="Browse...", command=self._browse_source).grid(row=0, column=2, pady=2)
 
         # Destination directory
-        tk.Label(self.root, text="Destination Directory:").place(x=10, y=40)
+        tk.Label(frame, text="Destination Directory:").grid(row=1, column=0, sticky="w")
         self.dst_var = tk.StringVar()
-        tk.Entry(self.root, textvariable=self.dst_var, width=86).place(x=130, y=40)
-        tk.Button(self.root, text="Browse...", command=self._browse_destination).place(x=720, y=36)
+        tk.Entry(frame, textvariable=self.dst_var).grid(row=1, column=1, sticky="ew", padx=6)
+        tk.Button(frame, text="Browse...", command=self._browse_destination).grid(row=1, column=2, pady=2)
 
+        options = tk.Frame(frame)
+        options.grid(row=2, column=1, columnspan=2, sticky="w")
         # Option to remove duplicates after copying
         self.remove_duplicates_var = tk.BooleanVar(value=True)
-        tk.Checkbutton(self.root, text="Remove duplicates after organizing", variable=self.remove_duplicates_var).place(x=130, y=72)
+        tk.Checkbutton(options, text="Remove duplicates after organizing", variable=self.remove_duplicates_var).grid(row=0, column=0)
+        # Deep scan also checks files that were already in the destination before this run
+        self.deep_scan_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(options, text="Deep scan whole destination", variable=self.deep_scan_var).grid(row=0, column=1)
+        # Exact hashing uses BLAKE3/SHA-256; unchecked uses the faster XXH3 fingerprint (needs xxhash)
+        self.exact_hash_var = tk.BooleanVar(value=xxhash is None)
+        tk.Checkbutton(options, text="Exact (cryptographic) hashing", variable=self.exact_hash_var,
+                       state="disabled" if xxhash is None else "normal").grid(row=0, column=2)
         # Start and Stop buttons
-        self.start_button = tk.Button(self.root, text="Start Organizing", width=18, command=self._confirm_and_start)
-        self.start_button.place(x=130, y=100)
-        self.stop_button = tk.Button(self.root, text="Request Stop", width=18, state="disabled", command=self._request_stop)
-        self.stop_button.place(x=300, y=100)
-        # Log area (readonly scrolled text)
-        self.log_widget = scrolledtext.ScrolledText(self.root, state="disabled", wrap="word")
-        self.log_widget.place(x=10, y=140, width=780, height=380)
+        buttons = tk.Frame(frame)
+        buttons.grid(row=3, column=1, columnspan=2, sticky="w", pady=4)
+        self.start_button = tk.Button(buttons, text="Start Organizing", width=18, command=self._confirm_and_start)
+        self.start_button.grid(row=0, column=0, padx=(0, 10))
+        self.stop_button = tk.Button(buttons, text="Request Stop", width=18, state="disabled", command=self._request_stop)
+        self.stop_button.grid(row=0, column=1)
+        # Log area (readonly scrolled text); no undo stack, it is never edited
+        self.log_widget = scrolledtext.ScrolledText(frame, state="disabled", wrap="word", undo=False)
+        self.log_widget.grid(row=4, column=0, columnspan=3, sticky="nsew")
     # UI helper methods
     def _browse_source(self):
         """Open directory chooser for source and set src_var."""
@@ -266,16 +694,20 @@ class FileOrganizerApp:
         path = filedialog.askdirectory()
         if path:
             self.dst_var.set(path)
-    def _append_log(self, text):
+    def _append_log(self, text, scroll=True):
         """
         Append text to log widget from the main thread only.
         The log widget is read-only to the user.
+        Pass scroll=False when appending several messages in a row and scroll once at the end.
         """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Batched worker messages hold several lines: stamp each one, insert them all at once
+        lines = "".join(f"[{timestamp}] {line}\n" for line in text.split("\n"))
         self.log_widget.configure(state="normal")
-        self.log_widget.insert("end", f"[{timestamp}] {text}\n")
-        self.log_widget.see("end")
+        self.log_widget.insert("end", lines)
         self.log_widget.configure(state="disabled")
+        if scroll:
+            self.log_widget.see("end")
     def _confirm_and_start(self):
         """
         Confirm with the user before starting, then start the worker thread.
@@ -306,7 +738,8 @@ class FileOrganizerApp:
         # Start worker thread (daemon so it won't prevent app from closing)
         self._worker_thread = threading.Thread(
             target=organize_files_worker,
-            args=(src, dst, self.remove_duplicates_var.get(), self._stop_event, self._msg_queue),
+            args=(src, dst, self.remove_duplicates_var.get(), self._stop_event, self._msg_queue,
+                  self.deep_scan_var.get(), self.exact_hash_var.get()),
             daemon=True,
             name="FileOrganizerWorker"
         )
@@ -322,19 +755,27 @@ class FileOrganizerApp:
             self._append_log("Stop requested by user.")
             # disable stop button to avoid duplicate clicks; worker will send 'stopped' or 'done'
             self.stop_button.config(state="disabled")
-    # Periodically process messages from the worker thread
+    # Process messages from the worker thread
+    def _watchdog_poll(self):
+        """Drain the queue once per WATCHDOG_INTERVAL_MS in case a notification event was missed."""
+        self._process_worker_messages()
+        self.root.after(WATCHDOG_INTERVAL_MS, self._watchdog_poll)
+
     def _process_worker_messages(self):
         """
         Dequeue all available messages and handle them on the GUI thread.
-        Then re-schedule itself with after().
+        Called from the WORKER_MESSAGE_EVENT binding and the watchdog poll.
+        The log is scrolled to the end once per drain rather than after every message.
         """
+        appended = False
         try:
             while True:
                 msg_type, text = self._msg_queue.get_nowait()
+                appended = True
                 if msg_type == "log":
-                    self._append_log(text)
+                    self._append_log(text, scroll=False)
                 elif msg_type == "progress":
-                    self._append_log(f"[progress] {text}")
+                    self._append_log(f"[progress] {text}", scroll=False)
                 elif msg_type == "error":
                     self._append_log(f"[ERROR] {text}")
                     messagebox.showerror("Background Error", text)
@@ -351,8 +792,8 @@ class FileOrganizerApp:
                 self._msg_queue.task_done()
         except queue.Empty:
             pass
-        # Schedule next check
-        self.root.after(150, self._process_worker_messages)
+        if appended:
+            self.log_widget.see("end")
 # -------------------------
 # Main entry point
 # -------------------------
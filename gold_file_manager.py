@@ -14,13 +14,24 @@ import os                                                  # OS operations
 import sys                                                 # System interaction
 import shutil                                              # Copying files with metadata
 import hashlib                                             # For file hashing
+import time                                                # Log flush timing
+import sqlite3                                             # Persistent hash cache
+import mmap                                                # Zero-copy hashing of large files
+import uuid                                                # Unique temporary link names
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QMainWindow, QFileDialog, QPushButton,
     QLineEdit, QLabel, QVBoxLayout, QHBoxLayout, QTabWidget,
-    QMessageBox, QTextEdit, QProgressBar
+    QMessageBox, QTextEdit, QProgressBar, QCheckBox
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal           # For multithreading and signals
-from collections import defaultdict                        # For grouping files by type
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal   # For multithreading and signals
+from PyQt5.QtGui import QTextCursor                        # Appending to the log in one edit
+from collections import defaultdict, deque                 # For grouping files by type, log buffering
+from functools import lru_cache                            # Memoized extension lookup
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED  # Parallel hashing/copying
+try:
+    import blake3                                          # Optional: SIMD + multithreaded hashing
+except ImportError:
+    blake3 = None
 # ===== File type definitions =========================================================
 FILE_TYPE_EXTENSION_MAP = {
     'office': ['.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.pdf'],
@@ -28,32 +39,221 @@ FILE_TYPE_EXTENSION_MAP = {
     'audio':  ['.mp3', '.wav', '.aac', '.flac', '.ogg', '.m4a'],
     'video':  ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.mkv', '.rmvb'],
 }
+EXTENSION_TO_CATEGORY_MAP = {                               # Flattened: {'.jpg': 'image', ...}
+    extension: category
+    for category, extension_list in FILE_TYPE_EXTENSION_MAP.items()
+    for extension in extension_list
+}
+@lru_cache(maxsize=None)
 def get_file_category_by_extension(file_extension):
     """
     Returns the file category by extension, or None if not classified.
+    Cached on the raw extension: a tree has few distinct ones, so repeats skip lower() and the lookup.
     """
-    extension_lowercase = file_extension.lower()
-    for category, extension_list in FILE_TYPE_EXTENSION_MAP.items():
-        if extension_lowercase in extension_list:
-            return category
-    return None
+    return EXTENSION_TO_CATEGORY_MAP.get(file_extension.lower())
 def ensure_directory_exists(directory_path):
     """
     Ensures a directory exists, creates it if not.
     """
     if not os.path.exists(directory_path):
         os.makedirs(directory_path)
-def calculate_file_md5(file_path):
+def copy_file_fast(source_file_path, destination_file_path, hardlink=False):
+    """
+    Copies a file with its metadata, like shutil.copy2, but avoids moving the bytes through Python.
+    With hardlink=True the destination is hard-linked to the source when both are on the same
+    filesystem (no data copied at all; both names then share the same content).
+    An existing destination file, such as an empty placeholder reserved for it, is overwritten.
+    Otherwise os.copy_file_range copies inside the kernel, as a reflink on Btrfs/XFS;
+    shutil.copy2 is the fallback where that is unavailable.
+    """
+    if hardlink:
+        # The destination may already exist as a reserved empty file: link beside it, then swap it in
+        # under a unique name, so a file that merely shares the temporary name is never touched
+        temporary_link_path = f"{destination_file_path}.{uuid.uuid4().hex}.link-tmp"
+        try:
+            os.link(source_file_path, temporary_link_path)
+        except OSError:
+            pass                                                                       # Other filesystem or unsupported: copy
+        else:
+            try:
+                os.replace(temporary_link_path, destination_file_path)
+                return
+            except OSError:
+                os.remove(temporary_link_path)                                         # Created by this call: clean it up, then copy
+    try:
+        with open(source_file_path, "rb") as source_file, open(destination_file_path, "wb") as destination_file:
+            remaining_bytes = os.fstat(source_file.fileno()).st_size
+            while remaining_bytes > 0:
+                copied_bytes = os.copy_file_range(source_file.fileno(), destination_file.fileno(), remaining_bytes)
+                if copied_bytes == 0:
+                    break
+                remaining_bytes -= copied_bytes
+        shutil.copystat(source_file_path, destination_file_path)
+    except (AttributeError, OSError):
+        shutil.copy2(source_file_path, destination_file_path)                          # Portable user-space copy
+def iter_files(root_directory):
+    """
+    Yields os.DirEntry objects for all regular files under root_directory.
+    DirEntry caches name, path and stat() results, so callers avoid extra syscalls and path joins.
+    Symlinks are not followed. Unreadable folders and entries are skipped, as os.walk does.
     """
-    Calculates the MD5 hash of a file. Returns None if any error occurs.
+    pending_directories = [root_directory]
+    while pending_directories:
+        directory_files = []
+        try:
+            with os.scandir(pending_directories.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_directories.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            directory_files.append(entry)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        yield from directory_files                                                         # After the folder is closed: caller errors are not swallowed
+HASH_READ_BUFFER_SIZE = 1 << 20                             # Read size for the pre-3.11 hashing loop
+MMAP_HASH_MIN_SIZE = 8 * 1024 * 1024                       # Files larger than this are memory-mapped for hashing
+BLAKE3_THREADED_MIN_SIZE = 16 * 1024 * 1024                # Files this large are hashed by several BLAKE3 threads
+BLAKE3_THREADS = max(1, min(4, (os.cpu_count() or 2) // 2))  # Threads per large file (files are also hashed in parallel)
+HEAD_HASH_SIZE = 64 * 1024                                 # Leading bytes hashed before a full hash
+HASH_WORKERS = min(32, os.cpu_count() or 4)                # Threads hashing files (hashlib releases the GIL)
+COPY_WORKERS = 8                                           # Files copied at the same time when organizing
+MAX_PENDING_COPIES = 64                                    # Bound on queued copies so memory stays flat
+HASH_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "gold_file_manager", "hashes.sqlite")
+HASH_CACHE_BATCH_SIZE = 500                                # New cache rows written per transaction
+LOG_FLUSH_LINES = 50                                       # Per-file log lines sent to the UI in one signal
+LOG_FLUSH_SECONDS = 0.1                                    # Longest time a log line waits in the worker
+LOG_VIEW_FLUSH_MS = 200                                    # Log widget is updated at most this often
+LOG_VIEW_MAX_LINES = 5000                                  # Older log lines are dropped from the widget
+def new_content_hasher():
+    """
+    Returns a new hash object for file contents: BLAKE3 (SIMD) if installed,
+    otherwise SHA-256, which is hardware-accelerated (SHA-NI / ARMv8 SHA2) on modern CPUs.
+    """
+    if blake3 is not None:
+        return blake3.blake3()
+    return hashlib.sha256()
+def calculate_file_digest(file_path):
+    """
+    Calculates the content hash of a file as a hex string. Returns None if the file cannot be read.
+    The digest is only used as an opaque key for comparing files.
+    On Python 3.11+ hashlib.file_digest runs the read/update loop in C.
+    Large files are memory-mapped into BLAKE3 in one call so it can split them across threads;
+    small files stay single-threaded, where spawning work would cost more than it saves.
+    Other files over MMAP_HASH_MIN_SIZE are memory-mapped and hashed in a single update.
+    The kernel is told the file is read once from start to end, so it reads ahead aggressively,
+    and its cached pages are dropped afterwards instead of evicting more useful data.
+    """
+    try:
+        with open(file_path, "rb", buffering=0) as file:
+            file_descriptor = file.fileno()
+            file_size = os.fstat(file_descriptor).st_size
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            try:
+                if blake3 is not None and file_size >= BLAKE3_THREADED_MIN_SIZE:
+                    hasher = blake3.blake3(max_threads=BLAKE3_THREADS)
+                    hasher.update_mmap(file_path)
+                    return hasher.hexdigest()
+                hasher = new_content_hasher()
+                if file_size > MMAP_HASH_MIN_SIZE:
+                    # Hash straight from the page cache: no read buffers, one update call
+                    with mmap.mmap(file_descriptor, 0, access=mmap.ACCESS_READ) as mapped_file:
+                        if hasattr(mmap, "MADV_SEQUENTIAL"):
+                            mapped_file.madvise(mmap.MADV_SEQUENTIAL)
+                        hasher.update(mapped_file)
+                    return hasher.hexdigest()
+                if hasattr(hashlib, "file_digest"):
+                    return hashlib.file_digest(file, new_content_hasher).hexdigest()
+                for chunk in iter(lambda: file.read(HASH_READ_BUFFER_SIZE), b""):
+                    hasher.update(chunk)
+                return hasher.hexdigest()
+            finally:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        return None
+class FileHashCache:
+    """
+    Persistent cache of full-content digests in SQLite, keyed by (device, inode) and valid while
+    the file's mtime_ns and size are unchanged, so re-runs only stat unchanged files.
+    Every method degrades to a no-op if the database cannot be used.
+    Must be used from the thread that created it.
+    """
+    def __init__(self, database_path=HASH_CACHE_PATH):
+        self.algorithm = "blake3" if blake3 is not None else "sha256"              # Digests of another algorithm never match
+        self._pending_rows = []
+        try:
+            os.makedirs(os.path.dirname(database_path), exist_ok=True)
+            self._connection = sqlite3.connect(database_path, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS hashes (dev INTEGER, ino INTEGER, mtime INTEGER, size INTEGER, "
+                "algorithm TEXT, digest TEXT, PRIMARY KEY (dev, ino))"
+            )
+        except (OSError, sqlite3.Error):
+            self._connection = None
+
+    def lookup(self, file_stat):
+        """
+        Returns the cached digest for a file's stat result, or None if unknown or out of date.
+        """
+        if self._connection is None or not file_stat.st_ino:
+            return None
+        try:
+            row = self._connection.execute(
+                "SELECT digest FROM hashes WHERE dev=? AND ino=? AND mtime=? AND size=? AND algorithm=?",
+                (file_stat.st_dev, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size, self.algorithm)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def store(self, file_stat, digest):
+        """
+        Queues a digest for the cache; rows are written in batches of HASH_CACHE_BATCH_SIZE.
+        """
+        if self._connection is None or not file_stat.st_ino:
+            return
+        self._pending_rows.append(
+            (file_stat.st_dev, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size, self.algorithm, digest))
+        if len(self._pending_rows) >= HASH_CACHE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes queued rows in a single transaction.
+        """
+        if self._connection is None or not self._pending_rows:
+            return
+        try:
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._connection.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)", self._pending_rows)
+        except sqlite3.Error:
+            pass
+        self._pending_rows = []
+
+    def close(self):
+        """
+        Writes queued rows and closes the database.
+        """
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+def calculate_file_head_digest(file_path, head_size=HEAD_HASH_SIZE):
+    """
+    Calculates a hash of the first head_size bytes of a file. Returns None if the file cannot be read.
+    Cheap pre-filter: files whose heads differ cannot be duplicates.
     """
-    hash_md5 = hashlib.md5()
     try:
         with open(file_path, "rb") as file:
-            for chunk in iter(lambda: file.read(8192), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except Exception as error:
+            return hashlib.blake2b(file.read(head_size)).hexdigest()
+    except OSError:
         return None
 # ====== File Organization Worker Thread =============================================
 class FileOrganizationWorker(QThread):
@@ -64,10 +264,40 @@ class FileOrganizationWorker(QThread):
     log_signal = pyqtSignal(str)
     progress_signal = pyqtSignal(int)
     finished_signal = pyqtSignal()
-    def __init__(self, source_root_directory, target_base_directory):
+    def __init__(self, source_root_directory, target_base_directory, hardlink_mode=False):
         super().__init__()
         self.source_root_directory = source_root_directory
         self.target_base_directory = target_base_directory
+        self.hardlink_mode = hardlink_mode                                             # Hard-link instead of copying when possible
+        self._dest_hash_cache = {}                                                     # {destination path: digest} for this run
+        self._last_progress = -1                                                       # Last percentage sent to the UI
+
+    def _emit_progress(self, processed_files_count, total_files_count):
+        """
+        Emits the progress percentage only when it changes, so the UI gets at most ~100 events.
+        """
+        progress = 100 * processed_files_count // total_files_count
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.progress_signal.emit(progress)
+
+    def _finish_copies(self, pending_copies, return_when):
+        """
+        Waits for queued copies (all of them, or at least one with FIRST_COMPLETED), logs failures
+        and removes finished copies from pending_copies ({destination path: (future, source path, source stat)}).
+        """
+        wait([future for future, _, _ in pending_copies.values()], return_when=return_when)
+        for destination_file_path, (future, source_file_path, _) in list(pending_copies.items()):
+            if not future.done():
+                continue
+            del pending_copies[destination_file_path]
+            error = future.exception()
+            if error is not None:
+                self.log_signal.emit(f"Failed to copy {source_file_path}: {str(error)}")
+                try:
+                    os.remove(destination_file_path)                                   # Do not leave a partial copy behind
+                except OSError:
+                    pass
 
     def run(self):
         """
@@ -78,18 +308,15 @@ class FileOrganizationWorker(QThread):
         """
         try:
             self.log_signal.emit("Scanning files...")                                  # Notify UI: start scan
-            categorized_file_paths = defaultdict(list)                                 # {category: [full_path, ...]}
+            categorized_file_paths = defaultdict(list)                                 # {category: [(full_path, name), ...]}
             total_files_count = 0                                                      # Used for progress reporting
 
             # Step 1: Scan and categorize all files in source directory recursively
-            for directory_path, _, file_names in os.walk(self.source_root_directory):
-                for file_name in file_names:
-                    file_extension = os.path.splitext(file_name)[1]
-                    file_category = get_file_category_by_extension(file_extension)
-                    if file_category:
-                        full_file_path = os.path.join(directory_path, file_name)
-                        categorized_file_paths[file_category].append(full_file_path)
-                        total_files_count += 1
+            for file_entry in iter_files(self.source_root_directory):
+                file_category = get_file_category_by_extension(os.path.splitext(file_entry.name)[1])
+                if file_category:
+                    categorized_file_paths[file_category].append((file_entry.path, file_entry.name))
+                    total_files_count += 1
 
             # Step 2: Prepare the target category folders
             category_target_directory_map = {
@@ -103,34 +330,85 @@ class FileOrganizationWorker(QThread):
 
             processed_files_count = 0
 
-            # Step 3: Copy files for each category, renaming duplicates
-            for category, file_path_list in categorized_file_paths.items():
-                for source_file_path in file_path_list:
-                    file_name = os.path.basename(source_file_path)
+            # Step 3: Copy files for each category, renaming duplicates.
+            # Names are resolved here one file at a time; the copies themselves run on a thread pool.
+            pending_copies = {}                                                        # {destination path: (future, source path, source stat)}
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="ConflictHash") as hash_executor, \
+                    ThreadPoolExecutor(max_workers=COPY_WORKERS, thread_name_prefix="FileCopy") as copy_executor:
+                path_separator = os.sep
+                for category, file_path_list in categorized_file_paths.items():
                     target_directory = category_target_directory_map[category]
-                    destination_file_path = os.path.join(target_directory, file_name)
-
-                    file_name_base, file_extension = os.path.splitext(file_name)
-                    version_index = 1
-
-                    # If duplicate name: check if identical by hash, if not, rename with suffix
-                    while os.path.exists(destination_file_path):
-                        if calculate_file_md5(destination_file_path) == calculate_file_md5(source_file_path):
-                            break                                                      # Identical, skip copy
-                        destination_file_path = os.path.join(
-                            target_directory, 
-                            f"{file_name_base}_{version_index}{file_extension}"
-                        )
-                        version_index += 1
-
-                    # Skip copy if identical already exists, otherwise copy file (with new name if needed)
-                    if not os.path.exists(destination_file_path):
-                        shutil.copy2(source_file_path, destination_file_path)          # Copy with metadata
-
-                    processed_files_count += 1
-                    self.progress_signal.emit(int(100 * processed_files_count / total_files_count))   # Update progress
-
-                self.log_signal.emit(f"Category '{category}' finished organizing.")
+                    for source_file_path, file_name in file_path_list:
+                        # Plain concatenation: target_directory never ends with a separator
+                        destination_file_path = f"{target_directory}{path_separator}{file_name}"
+                        file_name_base = None                                              # Split only if the name is taken
+                        version_index = 1
+                        source_file_stat = os.stat(source_file_path)
+                        source_digest = None                                               # Hashed at most once, only if needed
+
+                        destination_reserved = False
+
+                        # If duplicate name: check if identical by hash, if not, rename with suffix
+                        while True:
+                            pending_copy = pending_copies.get(destination_file_path)
+                            if pending_copy is not None:
+                                # Still being copied: compare against the file it is copied from
+                                _, comparison_file_path, destination_file_stat = pending_copy
+                            else:
+                                try:
+                                    # Claim the name atomically, so a concurrent run cannot take it too
+                                    os.close(os.open(destination_file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                                    destination_reserved = True
+                                    break
+                                except FileExistsError:
+                                    pass
+                                comparison_file_path = destination_file_path
+                                try:
+                                    destination_file_stat = os.stat(destination_file_path)
+                                except FileNotFoundError:
+                                    continue                                               # Removed meanwhile: try the name again
+                            # Same inode (overlapping folders, earlier hardlink run): identical without hashing
+                            if os.path.samestat(source_file_stat, destination_file_stat):
+                                break
+                            # Files of different sizes cannot be identical: skip hashing them
+                            if destination_file_stat.st_size == source_file_stat.st_size:
+                                # Same size and the exact mtime copy2 preserved: a copy from an earlier run
+                                if destination_file_stat.st_mtime_ns == source_file_stat.st_mtime_ns:
+                                    break
+                                destination_digest = self._dest_hash_cache.get(destination_file_path)
+                                if destination_digest is None and source_digest is None:
+                                    # Hash both files at the same time rather than one after the other
+                                    destination_digest, source_digest = hash_executor.map(
+                                        calculate_file_digest, (comparison_file_path, source_file_path))
+                                elif destination_digest is None:
+                                    destination_digest = calculate_file_digest(comparison_file_path)
+                                elif source_digest is None:
+                                    source_digest = calculate_file_digest(source_file_path)
+                                self._dest_hash_cache[destination_file_path] = destination_digest
+                                if destination_digest is not None and destination_digest == source_digest:
+                                    break                                                  # Identical, skip copy
+                            if file_name_base is None:
+                                file_name_base, file_extension = os.path.splitext(file_name)
+                            destination_file_path = (
+                                f"{target_directory}{path_separator}{file_name_base}_{version_index}{file_extension}"
+                            )
+                            version_index += 1
+
+                        # Skip copy if identical already exists, otherwise copy file into the reserved name
+                        if destination_reserved:
+                            future = copy_executor.submit(                                 # Copy with metadata
+                                copy_file_fast, source_file_path, destination_file_path, self.hardlink_mode)
+                            pending_copies[destination_file_path] = (future, source_file_path, source_file_stat)
+                            if source_digest is not None:
+                                self._dest_hash_cache[destination_file_path] = source_digest
+                            if len(pending_copies) >= MAX_PENDING_COPIES:
+                                self._finish_copies(pending_copies, FIRST_COMPLETED)
+
+                        processed_files_count += 1
+                        self._emit_progress(processed_files_count, total_files_count)       # Update progress
+
+                    self.log_signal.emit(f"Category '{category}' finished organizing.")
+                self._finish_copies(pending_copies, ALL_COMPLETED)
 
             self.log_signal.emit("All files have been organized.")
         except Exception as error:
@@ -151,51 +429,158 @@ class FileDeduplicationWorker(QThread):
     def __init__(self, target_directory):
         super().__init__()
         self.target_directory = target_directory
+        self._last_progress = -1                                                       # Last percentage sent to the UI
+        self._pending_log_lines = []                                                   # Per-file lines not yet sent
+        self._last_log_flush = time.monotonic()
+
+    def _emit_progress(self, processed_files_count, total_files_count):
+        """
+        Emits the progress percentage only when it changes, so the UI gets at most ~100 events.
+        """
+        progress = 100 * processed_files_count // total_files_count
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.progress_signal.emit(progress)
+
+    def _log_file_line(self, message):
+        """
+        Buffers a per-file log line; lines are sent as one signal every LOG_FLUSH_LINES lines
+        or LOG_FLUSH_SECONDS seconds.
+        """
+        self._pending_log_lines.append(message)
+        if (len(self._pending_log_lines) >= LOG_FLUSH_LINES
+                or time.monotonic() - self._last_log_flush >= LOG_FLUSH_SECONDS):
+            self._flush_log_lines()
+
+    def _flush_log_lines(self):
+        """
+        Sends all buffered per-file log lines to the UI.
+        """
+        if self._pending_log_lines:
+            self.log_signal.emit("\n".join(self._pending_log_lines))
+            self._pending_log_lines = []
+        self._last_log_flush = time.monotonic()
+
+    def _delete_duplicate(self, redundant_file_path):
+        """
+        Deletes one duplicate file and logs the outcome. Returns 1 if it was deleted, else 0.
+        """
+        if not os.path.exists(redundant_file_path):
+            return 0
+        try:
+            os.remove(redundant_file_path)
+            self._log_file_line(f"Deleted duplicate: {redundant_file_path}")
+            return 1
+        except Exception as error:
+            self._log_file_line(f"Failed to delete {redundant_file_path}: {str(error)}")
+            return 0
 
     def run(self):
         """
         Main worker thread run method.
-        1. Scan files, compute their hashes;
-        2. For files with the same hash, delete duplicates;
+        1. Walk files into size buckets, then group same-sized files by a hash of their first bytes;
+        2. Fully hash only files that still share size and head, deleting duplicates as they are found;
         3. Update UI via signals.
         """
         try:
             self.log_signal.emit("Calculating file hashes...")                           # UI log: start hash pass
-            hash_to_file_paths_map = defaultdict(list)                                   # {hash: [file1, file2, ...]}
-            all_file_paths = []
-
-            # Step 1: Scan all files recursively to a list
-            for directory_path, _, file_names in os.walk(self.target_directory):
-                for file_name in file_names:
-                    full_file_path = os.path.join(directory_path, file_name)
-                    all_file_paths.append(full_file_path)
-
-            total_files_count = len(all_file_paths)
-
-            # Step 2: Compute and group by hash
-            for index, file_path in enumerate(all_file_paths):
-                file_md5 = calculate_file_md5(file_path)
-                if file_md5:
-                    hash_to_file_paths_map[file_md5].append(file_path)
-                self.progress_signal.emit(int(100 * (index + 1) / total_files_count))    # Progress update
-
-            self.log_signal.emit("Checking duplicate files...")
+            hash_cache = FileHashCache()                                                 # Opened here: SQLite objects stay on this thread
+            first_file_path_by_size = {}                                                 # {size: first path seen}
+            size_to_file_paths_map = {}                                                  # {size: [file1, file2, ...]}, collisions only
+            seen_inodes = set()                                                          # {(st_dev, st_ino)} of multiply-linked files
+            hardlinked_file_paths = []                                                   # Further names of an already seen file
+
+            # Step 1: Walk the tree straight into the size buckets; sizes come from the scandir stat cache.
+            # Only sizes seen twice keep a list, so memory grows with the candidates, not with the tree.
+            for file_entry in iter_files(self.target_directory):
+                try:
+                    file_stat = file_entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                # A second name for the same inode is a duplicate by definition: no need to read it.
+                # Only files with several links can have one; st_ino is 0 where the platform does not
+                # report it (scandir on Windows).
+                if file_stat.st_nlink > 1 and file_stat.st_ino:
+                    inode_key = (file_stat.st_dev, file_stat.st_ino)
+                    if inode_key in seen_inodes:
+                        hardlinked_file_paths.append(file_entry.path)
+                        continue
+                    seen_inodes.add(inode_key)
+                first_file_path = first_file_path_by_size.setdefault(file_stat.st_size, file_entry.path)
+                if first_file_path is not file_entry.path:
+                    same_size_file_paths = size_to_file_paths_map.get(file_stat.st_size)
+                    if same_size_file_paths is None:
+                        size_to_file_paths_map[file_stat.st_size] = [first_file_path, file_entry.path]
+                    else:
+                        same_size_file_paths.append(file_entry.path)
+            first_file_path_by_size.clear()
 
             deleted_files_count = 0
 
-            # Step 3: For each group of identical files, keep one and delete the rest
-            for duplicate_file_list in hash_to_file_paths_map.values():
-                for redundant_file_path in duplicate_file_list[1:]:                      # Keep first, delete the rest
-                    if os.path.exists(redundant_file_path):
-                        try:
-                            os.remove(redundant_file_path)
-                            self.log_signal.emit(f"Deleted duplicate: {redundant_file_path}")
-                            deleted_files_count += 1
-                        except Exception as error:
-                            self.log_signal.emit(f"Failed to delete {redundant_file_path}: {str(error)}")
+            # Step 2: Within a size, group by a hash of the first bytes
+            # Hashing runs on a thread pool; results are consumed in input order so the kept file stays the same
+            with ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="FileHash") as hash_executor:
+                head_to_file_paths_map = defaultdict(list)                               # {(size, head hash): [file1, ...]}
+                sized_file_paths = [(size, path) for size, paths in size_to_file_paths_map.items() for path in paths]
+                size_to_file_paths_map.clear()
+                head_digests = hash_executor.map(calculate_file_head_digest, [path for _, path in sized_file_paths])
+                for (file_size, file_path), head_digest in zip(sized_file_paths, head_digests):
+                    if head_digest:
+                        head_to_file_paths_map[(file_size, head_digest)].append(file_path)
+                candidate_groups = [(size, paths) for (size, _), paths in head_to_file_paths_map.items() if len(paths) > 1]
+                head_to_file_paths_map.clear()
+                candidate_sized_file_paths = [(size, path) for size, paths in candidate_groups for path in paths]
+                candidate_group_ids = [group_id for group_id, (_, paths) in enumerate(candidate_groups) for _ in paths]
+
+                # Step 3: Full hash only for the remaining candidates. Progress counts bytes hashed;
+                # a duplicate is deleted as soon as its hash matches an earlier file.
+                total_candidate_bytes = sum(size for size, _ in candidate_sized_file_paths)
+                hashed_bytes = 0
+                self.log_signal.emit(f"{len(candidate_sized_file_paths)} file(s) share size and head bytes, hashing them in full...")
+                self.log_signal.emit("Checking duplicate files...")
+                # Only files of one (size, head) group can share a digest, and groups arrive one after
+                # another: the digest map is per group and emptied when the next group starts
+                first_file_path_by_digest = {}                                           # {hash: kept file} of the current group
+                current_group_id = None
+                # Digests from earlier runs are reused for files whose inode, mtime and size are unchanged;
+                # only the rest are read and hashed
+                candidate_file_stats = []
+                for _, file_path in candidate_sized_file_paths:
+                    try:
+                        candidate_file_stats.append(os.stat(file_path))
+                    except OSError:
+                        candidate_file_stats.append(None)
+                cached_digests = [hash_cache.lookup(file_stat) if file_stat else None for file_stat in candidate_file_stats]
+                computed_digests = hash_executor.map(
+                    calculate_file_digest,
+                    [path for (_, path), digest in zip(candidate_sized_file_paths, cached_digests) if digest is None])
+                for (file_size, file_path), group_id, file_stat, file_digest in zip(
+                        candidate_sized_file_paths, candidate_group_ids, candidate_file_stats, cached_digests):
+                    if group_id != current_group_id:
+                        first_file_path_by_digest.clear()
+                        current_group_id = group_id
+                    if file_digest is None:
+                        file_digest = next(computed_digests)
+                        if file_digest and file_stat:
+                            hash_cache.store(file_stat, file_digest)
+                    if file_digest:
+                        if first_file_path_by_digest.setdefault(file_digest, file_path) is not file_path:
+                            deleted_files_count += self._delete_duplicate(file_path)
+                    hashed_bytes += file_size
+                    if total_candidate_bytes:
+                        self._emit_progress(hashed_bytes, total_candidate_bytes)
+
+            hash_cache.close()
+
+            # Step 4: Remove the extra names of hard-linked files
+            for redundant_file_path in hardlinked_file_paths:
+                deleted_files_count += self._delete_duplicate(redundant_file_path)
+            self._flush_log_lines()
+            self._emit_progress(1, 1)                                                    # Done, even with no candidates
 
             self.log_signal.emit(f"Deduplication complete, {deleted_files_count} file(s) deleted.")
         except Exception as error:
+            self._flush_log_lines()
             self.log_signal.emit(f"Error: {str(error)}")
         self.finished_signal.emit()                                                     # Notify UI: finished
 
@@ -210,6 +595,11 @@ class FileOrganizationTab(QWidget):
         super().__init__()
         self._setup_ui()
         self.worker_thread = None                                                      # Will store running worker
+        self._log_buffer = deque(maxlen=LOG_VIEW_MAX_LINES)                            # Messages not yet shown
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(LOG_VIEW_FLUSH_MS)
+        self._log_flush_timer.timeout.connect(self._flush_log)
 
     def _setup_ui(self):
         layout = QVBoxLayout()
@@ -243,6 +633,10 @@ class FileOrganizationTab(QWidget):
         target_layout.addWidget(browse_target_button)
         layout.addLayout(target_layout)
 
+        # ----- Hardlink Option -----
+        self.hardlink_mode_check_box = QCheckBox("Hardlink mode (same drive only: no extra space, files share content)")
+        layout.addWidget(self.hardlink_mode_check_box)
+
         # ----- Start Button -----
         self.start_organize_button = QPushButton("Start Organizing")
         self.start_organize_button.setMinimumHeight(40)
@@ -260,6 +654,7 @@ class FileOrganizationTab(QWidget):
         self.log_text_edit = QTextEdit()
         self.log_text_edit.setMinimumHeight(150)
         self.log_text_edit.setReadOnly(True)
+        self.log_text_edit.document().setMaximumBlockCount(LOG_VIEW_MAX_LINES)     # Keep layout cost bounded
         layout.addWidget(self.log_text_edit)
 
         layout.addStretch()
@@ -295,11 +690,13 @@ class FileOrganizationTab(QWidget):
             QMessageBox.warning(self, "Error", "Source and target directories cannot be the same.")
             return
 
+        self._log_buffer.clear()
         self.log_text_edit.clear()                                                     # Clear old log
         self.start_organize_button.setEnabled(False)                                   # Disable button during job
 
         # Start worker thread for file organization
-        self.worker_thread = FileOrganizationWorker(source_directory, target_directory)
+        self.worker_thread = FileOrganizationWorker(
+            source_directory, target_directory, self.hardlink_mode_check_box.isChecked())
         self.worker_thread.log_signal.connect(self._append_log)
         self.worker_thread.progress_signal.connect(self.progress_bar.setValue)
         self.worker_thread.finished_signal.connect(self._on_job_finished)
@@ -307,15 +704,33 @@ class FileOrganizationTab(QWidget):
 
     def _append_log(self, message):
         """
-        Slot for worker log signal. Appends message to log text.
+        Slot for worker log signal. Buffers the message; the log is updated every LOG_VIEW_FLUSH_MS.
+        """
+        self._log_buffer.append(message)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+
+    def _flush_log(self):
+        """
+        Inserts all buffered messages into the log with a single edit and scrolls to the end.
         """
-        self.log_text_edit.append(message)
+        if not self._log_buffer:
+            return
+        text = "\n".join(self._log_buffer)
+        self._log_buffer.clear()
+        if not self.log_text_edit.document().isEmpty():
+            text = "\n" + text
+        cursor = self.log_text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.log_text_edit.setTextCursor(cursor)
         self.log_text_edit.ensureCursorVisible()
 
     def _on_job_finished(self):
         """
         Slot for job finished signal. Shows dialog and re-enables button.
         """
+        self._flush_log()
         QMessageBox.information(self, "Complete", "File organization complete!")
         self.start_organize_button.setEnabled(True)
         self.progress_bar.setValue(0)
@@ -330,6 +745,11 @@ class FileDeduplicationTab(QWidget):
         super().__init__()
         self._setup_ui()
         self.worker_thread = None                                                      # Will store running worker
+        self._log_buffer = deque(maxlen=LOG_VIEW_MAX_LINES)                            # Messages not yet shown
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(LOG_VIEW_FLUSH_MS)
+        self._log_flush_timer.timeout.connect(self._flush_log)
 
     def _setup_ui(self):
         layout = QVBoxLayout()
@@ -367,6 +787,7 @@ class FileDeduplicationTab(QWidget):
         self.log_text_edit = QTextEdit()
         self.log_text_edit.setMinimumHeight(150)
         self.log_text_edit.setReadOnly(True)
+        self.log_text_edit.document().setMaximumBlockCount(LOG_VIEW_MAX_LINES)     # Keep layout cost bounded
         layout.addWidget(self.log_text_edit)
 
         layout.addStretch()
@@ -389,6 +810,7 @@ class FileDeduplicationTab(QWidget):
             QMessageBox.warning(self, "Error", "Please choose a valid directory to deduplicate.")
             return
 
+        self._log_buffer.clear()
         self.log_text_edit.clear()
         self.start_deduplication_button.setEnabled(False)
 
@@ -400,21 +822,53 @@ class FileDeduplicationTab(QWidget):
 
     def _append_log(self, message):
         """
-        Append a message to the log.
+        Buffer a message for the log; the log is updated every LOG_VIEW_FLUSH_MS.
+        """
+        self._log_buffer.append(message)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+
+    def _flush_log(self):
+        """
+        Inserts all buffered messages into the log with a single edit and scrolls to the end.
         """
-        self.log_text_edit.append(message)
+        if not self._log_buffer:
+            return
+        text = "\n".join(self._log_buffer)
+        self._log_buffer.clear()
+        if not self.log_text_edit.document().isEmpty():
+            text = "\n" + text
+        cursor = self.log_text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.log_text_edit.setTextCursor(cursor)
         self.log_text_edit.ensureCursorVisible()
 
     def _on_job_finished(self):
         """
         Show completion dialog and re-enable button.
         """
+        self._flush_log()
         QMessageBox.information(self, "Complete", "Deduplication process is finished!")
         self.start_deduplication_button.setEnabled(True)
         self.progress_bar.setValue(0)
 
 # ====== Main Application Window =====================================================
 
+# Gold-colored QSS for the whole window, built once at import
+GOLD_THEME_QSS = """
+QMainWindow{background:#26221B;}
+QTabWidget::pane { border: 2px solid #FFD700; }
+QTabBar::tab:selected {background: #FFD700; color:#202020;}
+QTabBar::tab { background: #766339; color:#FFD700; font-size:18px; min-width:110px; min-height:30px; border-radius:8px;}
+QPushButton { background:#FFD700; color:#202020; font-weight:bold; border:none; border-radius:8px; min-width:100px; min-height:36px;}
+QPushButton:pressed {background:#CCAC00;}
+QProgressBar { border:1px solid #FFD700; background:#685d3d; height:22px; border-radius:8px; text-align:center; color:#FFD700;}
+QProgressBar::chunk { background-color: #FFD700; }
+QLineEdit, QTextEdit { background: #FFF8DC; color:#222; border:1px solid #FFD700; border-radius:7px;}
+QLabel{color:#FFD700; font-size:16px; font-family:微软雅黑;}
+"""
+
 class MainWindow(QMainWindow):
     """
     Main logic and UI window for the tool, handles both tab pages.
@@ -428,24 +882,7 @@ class MainWindow(QMainWindow):
         main_tab_widget.addTab(FileOrganizationTab(), "Organize Files")
         main_tab_widget.addTab(FileDeduplicationTab(), "Remove Duplicates")
         self.setCentralWidget(main_tab_widget)
-        self.setStyleSheet(self._gold_theme_qss())
-
-    def _gold_theme_qss(self):
-        """
-        Returns gold-colored QSS string for styling the UI.
-        """
-        return """
-QMainWindow{background:#26221B;}
-QTabWidget::pane { border: 2px solid #FFD700; }
-QTabBar::tab:selected {background: #FFD700; color:#202020;}
-QTabBar::tab { background: #766339; color:#FFD700; font-size:18px; min-width:110px; min-height:30px; border-radius:8px;}
-QPushButton { background:#FFD700; color:#202020; font-weight:bold; border:none; border-radius:8px; min-width:100px; min-height:36px;}
-QPushButton:pressed {background:#CCAC00;}
-QProgressBar { border:1px solid #FFD700; background:#685d3d; height:22px; border-radius:8px; text-align:center; color:#FFD700;}
-QProgressBar::chunk { background-color: #FFD700; }
-QLineEdit, QTextEdit { background: #FFF8DC; color:#222; border:1px solid #FFD700; border-radius:7px;}
-QLabel{color:#FFD700; font-size:16px; font-family:微软雅黑;}
-"""
+        self.setStyleSheet(GOLD_THEME_QSS)
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
@@ -10,122 +10,334 @@ Run: python media_collector_tk_improved.py
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
+import os
+import errno
+import sys
 import threading
 import shutil
 import csv
 import queue
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+
+# Read/write chunk for shutil's user-space copies (copyfile fallback, cross-device move):
+# 1 MiB instead of the 64 KiB default cuts syscalls per file, notably on network shares
+shutil.COPY_BUFSIZE = 1024 * 1024
+
+# Windows: CopyFileW copies inside the OS (and server-side on SMB), keeping attributes and times
+# Linux: FICLONE ioctl clones a file on copy-on-write filesystems without copying data
+FICLONE = 0x40049409
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import ctypes
+if sys.platform == "win32":
+    from ctypes import wintypes
+    _CopyFileW = ctypes.windll.kernel32.CopyFileW
+    _CopyFileW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.BOOL]
+    _CopyFileW.restype = wintypes.BOOL
+else:
+    _CopyFileW = None
+
+# Linux: renameat2(RENAME_NOREPLACE) renames only if the target does not exist, in one atomic step
+AT_FDCWD = -100
+RENAME_NOREPLACE = 1
+_renameat2 = None
+if sys.platform.startswith("linux"):
+    try:
+        _renameat2 = ctypes.CDLL(None, use_errno=True).renameat2  # glibc 2.28+
+        _renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+        _renameat2.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _renameat2 = None
+
+# Copies/moves in flight at once: file I/O blocks in syscalls, so threads overlap well
+COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+MAX_PENDING = COPY_WORKERS * 4  # Bound on queued tasks so memory stays flat
+BATCH_SIZE = 64                 # Item messages sent to the UI in one queue message
+BATCH_SECONDS = 0.1             # Longest time an item message waits in the worker
+PROGRESS_QUEUE_SIZE = 10000     # Worker blocks on put() when the UI falls this far behind
+SORT_BY_INODE = os.name != "nt"  # DirEntry.inode() is free on POSIX, a stat() per file on Windows
+CASE_INSENSITIVE_FS = sys.platform in ("win32", "darwin")  # Default filesystems ignore name case
+
+# Worker -> UI message types (first field of each progress_q tuple)
+MSG_COUNT, MSG_ITEM, MSG_DONE, MSG_ERR, MSG_ITEMS = range(5)
 
 # File type extensions (can extend as needed)
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp", ".heic"}
 VIDEO_EXTS = {".mp4", ".mov", ".mkv", ".avi", ".wmv", ".flv", ".webm"}
 AUDIO_EXTS = {".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a"}
 CATEGORY_EXTS = {"images": IMAGE_EXTS, "videos": VIDEO_EXTS, "audios": AUDIO_EXTS}
-def scan_media_files(sources, follow_symlinks=False):
+# One lookup per file; upper-case variants included so common names skip .lower()
+EXT_TO_CAT = {e: cat for cat, exts in CATEGORY_EXTS.items() for ext in exts for e in (ext, ext.upper())}
+EXT_TUPLE = tuple(EXT_TO_CAT)  # For a single str.endswith() pre-check per name
+def scan_media_files(sources, follow_symlinks=False, skip_dirs=()):
     """
-    Generator: yield (source_path: Path, category: str) for each media file found.
+    Generator: yield (source_path: str, category: str) for each media file found.
+    Directories listed in skip_dirs (e.g. the destination) are not entered.
+    Walks with os.scandir: is_dir()/is_file() answer from the type readdir returned, so a
+    regular file costs no stat() at all (only DT_UNKNOWN entries and followed symlinks are
+    stat'ed, once, and the result is cached on the entry). The only explicit stat is one per
+    directory when follow_symlinks is set, to detect symlink loops.
+    Files come out one directory at a time, in inode order where inodes are free to read,
+    which roughly follows their layout on disk and keeps reads sequential.
     Do not perform I/O or GUI updates here.
     """
+    skip_keys = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs}
     for src in sources:
-        base = Path(src)
-        if not base.exists():
+        if not os.path.isdir(src):
             continue
-        for p in base.rglob("*"):
+        pending_dirs = [src]
+        visited_dirs = set()                      # (st_dev, st_ino) of followed dirs, guards against symlink loops
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            if follow_symlinks:
+                try:
+                    st = os.stat(current_dir)
+                except OSError:
+                    continue
+                if (st.st_dev, st.st_ino) in visited_dirs:
+                    continue
+                visited_dirs.add((st.st_dev, st.st_ino))
+            found = []
             try:
-                if p.is_file():
-                    ext = p.suffix.lower()
-                    for category, exts in CATEGORY_EXTS.items():
-                        if ext in exts:
-                            yield p, category
-                            break
-            except PermissionError:
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=follow_symlinks):
+                                if not skip_keys or os.path.normcase(os.path.abspath(entry.path)) not in skip_keys:
+                                    pending_dirs.append(entry.path)
+                            elif entry.is_file(follow_symlinks=follow_symlinks):
+                                name = entry.name
+                                dot = name.rfind(".")
+                                if dot <= 0:              # No extension (or a dot-file), like splitext
+                                    continue
+                                if name.endswith(EXT_TUPLE):
+                                    category = EXT_TO_CAT[name[dot:]]
+                                else:                     # Mixed case (.Jpg) or not media
+                                    category = EXT_TO_CAT.get(name[dot:].lower())
+                                if category:
+                                    found.append((entry, category))
+                        except OSError:
+                            continue
+            except OSError:
                 continue
-def make_safe_target(dest_root: Path, category: str, src_path: Path, strategy: str):
+            if SORT_BY_INODE:
+                found.sort(key=lambda item: item[0].inode())
+            for entry, category in found:
+                yield entry.path, category
+def name_key(name):
+    """Key for comparing file names the way the destination filesystem does (case-insensitive on Windows/macOS)."""
+    return name.casefold() if CASE_INSENSITIVE_FS else name
+def make_safe_target(dest_root: Path, category: str, src_path: str, strategy: str, taken=None):
     """
     Compute a non-conflicting target Path for src_path under dest_root/category.
     strategy: 'number' -> append (1),(2)... ; 'prefix' -> prepend sanitized source path.
-    This function does not create files; it only computes the Path.
+    taken: optional set of name_key()s already used in dest_root/category (listed once by the
+    caller); names are then checked against it without a stat per candidate, and the result
+    is added to it. Callers running in parallel must hold a lock around this call.
+    This function does not create files or folders; it only computes the Path.
     """
     dest_dir = dest_root / category
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    candidate = dest_dir / src_path.name
+    src_name = os.path.basename(src_path)
     if strategy == "prefix":
-        sanitized = src_path.as_posix().lstrip("/").replace("/", "__").replace(":", "")
-        candidate = dest_dir / f"{sanitized}__{src_path.name}"
-        i = 1
-        stem = candidate.stem
-        suffix = candidate.suffix
-        while candidate.exists():
-            candidate = dest_dir / f"{stem}({i}){suffix}"
-            i += 1
-        return candidate
-    if strategy == "number":
-        if not candidate.exists():
-            return candidate
-        base = candidate.stem
-        suffix = candidate.suffix
-        i = 1
-        while True:
-            candidate = dest_dir / f"{base}({i}){suffix}"
-            if not candidate.exists():
-                return candidate
-            i += 1
-    raise ValueError("Unknown strategy")
+        sanitized = src_path.replace(os.sep, "/").lstrip("/").replace("/", "__").replace(":", "")
+        name = f"{sanitized}__{src_name}"
+    elif strategy == "number":
+        name = src_name
+    else:
+        raise ValueError("Unknown strategy")
+    if taken is None:
+        is_taken = lambda n: (dest_dir / n).exists()
+    else:
+        is_taken = lambda n: name_key(n) in taken
+    stem, suffix = os.path.splitext(name)
+    i = 1
+    while is_taken(name):
+        name = f"{stem}({i}){suffix}"
+        i += 1
+    if taken is not None:
+        taken.add(name_key(name))
+    return dest_dir / name
+def fast_copy(src, dst):
+    """
+    Copy src to dst with metadata, like shutil.copy2, keeping the bytes in the kernel.
+    Windows uses CopyFileW. On Linux a FICLONE ioctl first tries an instant copy-on-write
+    clone (Btrfs/XFS); otherwise os.copy_file_range copies server-side on NFS. If neither
+    is available or the call is refused, shutil.copyfile is used (sendfile on Linux).
+    """
+    copied = False
+    if _CopyFileW is not None:
+        copied = bool(_CopyFileW(os.path.abspath(src), os.path.abspath(dst), False))
+    elif hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                try:
+                    fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())  # Shares the data blocks, O(1)
+                except OSError:                                         # Not CoW, or other filesystem
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if n == 0:
+                            break
+                        remaining -= n
+            copied = True
+        except OSError:
+            pass
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+def move_file(src, dst):
+    """
+    Move src to dst. On the same filesystem this is a single atomic rename;
+    across devices shutil.move copies and deletes instead.
+    On Linux the rename never replaces an existing dst: FileExistsError is raised
+    instead, so a file created there by someone else since the name was chosen survives.
+    """
+    if _renameat2 is not None:
+        if _renameat2(AT_FDCWD, os.fsencode(src), AT_FDCWD, os.fsencode(dst), RENAME_NOREPLACE) == 0:
+            return
+        err = ctypes.get_errno()
+        if err == errno.EEXIST:
+            raise FileExistsError(err, os.strerror(err), dst)
+        if err not in (errno.EINVAL, errno.ENOSYS, errno.EXDEV):  # EINVAL/ENOSYS: flag unsupported here
+            raise OSError(err, os.strerror(err), src)
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
 def worker_collect(sources, dest, strategy, move_files, follow_symlinks,
                    dry_run, log_path, progress_q, stop_event):
     """
     Worker thread function:
-    - Scans files
+    - Scans files, handing each to the copy pool as soon as it is found,
+      so copying overlaps the directory walk
     - For each file, computes safe target and performs copy/move (unless dry_run)
     - Puts progress messages into progress_q (thread-safe)
     - Responds to stop_event to cancel operation
-    Message protocol (dict):
-      {'type':'count', 'total': int}
-      {'type':'item', 'index':i, 'total':n, 'src':str, 'tgt':str, 'action':str}
-      {'type':'done', 'processed':int, 'errors':int}
-      {'type':'error', 'msg':str}
+    Message protocol (tuples, first field is the MSG_* type):
+      (MSG_COUNT, total)                                    # sent once the scan has finished
+      (MSG_ITEMS, [item, ...]), each item being
+        (MSG_ITEM, index, total, src, tgt, action, error)   # total: files found so far; error is "" unless action == "error"
+      (MSG_DONE, processed, errors)
+      (MSG_ERR, msg)
     """
     try:
-        items = list(scan_media_files(sources, follow_symlinks=follow_symlinks))
-        total = len(items)
-        progress_q.put({"type": "count", "total": total})
-        results = []
-        errors = []
-        for idx, (src_path, category) in enumerate(items, start=1):
+        total = 0                                           # Files found so far; final once the scan ends
+        processed = 0
+        error_count = 0
+        dest_root = Path(dest)
+        # Create each category folder once up front and list its names once;
+        # make_safe_target then adds every name it hands out
+        taken = {}
+        for category in CATEGORY_EXTS:
+            category_dir = dest_root / category
+            category_dir.mkdir(parents=True, exist_ok=True)
+            taken[category] = {name_key(n) for n in os.listdir(category_dir)}
+        name_lock = threading.Lock()
+        def collect_one(src_path, category):
+            # Runs on the pool: returns a result row, or None if the task was cancelled
             if stop_event.is_set():
-                break
+                return None
             try:
-                target = make_safe_target(Path(dest), category, src_path, strategy)
+                with name_lock:
+                    target = make_safe_target(dest_root, category, src_path, strategy, taken[category])
                 action = "would_move" if (dry_run and move_files) else ("would_copy" if dry_run else ("moved" if move_files else "copied"))
                 if not dry_run:
                     if move_files:
-                        shutil.move(str(src_path), str(target))
+                        while True:
+                            try:
+                                move_file(src_path, str(target))
+                                break
+                            except FileExistsError:
+                                # Created behind our back: that name is now in taken, pick the next one
+                                with name_lock:
+                                    target = make_safe_target(dest_root, category, src_path, strategy, taken[category])
                     else:
-                        shutil.copy2(str(src_path), str(target))
+                        fast_copy(src_path, str(target))
                     action = "moved" if move_files else "copied"
-                results.append((str(src_path), str(target), category, action, "ok"))
-                progress_q.put({"type": "item", "index": idx, "total": total, "src": str(src_path), "tgt": str(target), "action": action})
+                return (src_path, str(target), category, action, "ok")
             except Exception as e:
-                errors.append((str(src_path), category, str(e)))
-                results.append((str(src_path), "", category, "error", str(e)))
-                progress_q.put({"type": "item", "index": idx, "total": total, "src": str(src_path), "tgt": "", "action": "error", "error": str(e)})
+                return (src_path, "", category, "error", str(e))
+        batch = []
+        last_flush = time.monotonic()
+        def flush_batch():
+            nonlocal batch, last_flush
+            if batch:
+                progress_q.put((MSG_ITEMS, batch))
+                batch = []
+            last_flush = time.monotonic()
+        # CSV rows are written as files finish, so nothing is held back and a crash leaves a partial log
+        log_fh = None
+        writer = None
+        log_error = None
         if log_path:
             try:
-                with open(log_path, "w", newline="", encoding="utf-8") as fh:
-                    writer = csv.writer(fh)
-                    writer.writerow(["source", "target", "category", "action", "status"])
-                    writer.writerows(results)
+                log_fh = open(log_path, "w", newline="", encoding="utf-8")
+                writer = csv.writer(log_fh)
+                writer.writerow(["source", "target", "category", "action", "status"])
             except Exception as e:
-                progress_q.put({"type": "error", "msg": f"Failed to write log: {e}"})
-        progress_q.put({"type": "done", "processed": len(results), "errors": len(errors)})
+                log_error = e
+                writer = None
+        def report(future):
+            nonlocal processed, error_count, writer, log_error
+            row = future.result()
+            if row is None:
+                return
+            processed += 1
+            idx = processed
+            if writer is not None:
+                try:
+                    writer.writerow(row)
+                except Exception as e:
+                    log_error = e
+                    writer = None
+            src_path, target, category, action, status = row
+            if action == "error":
+                error_count += 1
+                batch.append((MSG_ITEM, idx, total, src_path, "", "error", status))
+            else:
+                batch.append((MSG_ITEM, idx, total, src_path, target, action, ""))
+            if len(batch) >= BATCH_SIZE or time.monotonic() - last_flush >= BATCH_SECONDS:
+                flush_batch()
+        try:
+            with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+                pending = set()
+                # The destination is skipped so files copied/moved there are not picked up again
+                for src_path, category in scan_media_files(sources, follow_symlinks=follow_symlinks, skip_dirs=[dest]):
+                    if stop_event.is_set():
+                        break
+                    total += 1
+                    pending.add(executor.submit(collect_one, src_path, category))
+                    if len(pending) >= MAX_PENDING:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            report(future)
+                else:
+                    progress_q.put((MSG_COUNT, total))
+                for future in as_completed(pending):
+                    report(future)
+        finally:
+            if log_fh is not None:
+                log_fh.close()
+        flush_batch()
+        if log_error is not None:
+            progress_q.put((MSG_ERR, f"Failed to write log: {log_error}"))
+        progress_q.put((MSG_DONE, processed, error_count))
     except Exception as e:
-        progress_q.put({"type": "error", "msg": str(e)})
+        progress_q.put((MSG_ERR, str(e)))
 class MediaCollectorApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Media Collector")
         self.geometry("820x560")
         self._sources = []
-        self._progress_q = queue.Queue()
+        self._progress_q = queue.Queue(maxsize=PROGRESS_QUEUE_SIZE)
         self._stop_event = threading.Event()
         self._worker = None
         self._create_widgets()
@@ -212,11 +424,7 @@ class MediaCollectorApp(tk.Tk):
         if not dest:
             messagebox.showwarning("Warning", "Choose a destination folder.")
             return
-        items = []
-        for p, cat in scan_media_files(self._sources, follow_symlinks=self._follow_var.get()):
-            items.append((p, cat))
-            if len(items) >= 20:
-                break
+        items = list(islice(scan_media_files(self._sources, follow_symlinks=self._follow_var.get()), 20))
         self._log_text.delete("1.0", "end")
         self._log_text.insert("end", f"Preview (up to 20): found {len(items)} files\n")
         for i, (p, cat) in enumerate(items, start=1):
@@ -261,32 +469,31 @@ class MediaCollectorApp(tk.Tk):
         try:
             while True:
                 msg = self._progress_q.get_nowait()
-                mtype = msg.get("type")
-                if mtype == "count":
-                    total = msg.get("total", 0)
+                mtype = msg[0]
+                if mtype == MSG_COUNT:
+                    total = msg[1]
                     self._progress["maximum"] = max(total, 1)
                     self._log_text.insert("end", f"Total files: {total}\n")
-                elif mtype == "item":
-                    idx = msg.get("index", 0)
-                    total = msg.get("total", 1)
-                    action = msg.get("action", "")
-                    src = msg.get("src", "")
-                    tgt = msg.get("tgt", "")
-                    if action == "error":
-                        err = msg.get("error", "")
-                        self._log_text.insert("end", f"[{idx}/{total}] ERROR: {src} -> {err}\n")
-                    else:
-                        self._log_text.insert("end", f"[{idx}/{total}] {action}: {src} -> {tgt}\n")
-                    self._progress["value"] = idx
-                    self._log_text.see("end")
-                elif mtype == "done":
-                    processed = msg.get("processed", 0)
-                    errors = msg.get("errors", 0)
+                elif mtype == MSG_ITEMS:
+                    # One Text insert and one scroll for the whole batch
+                    lines = []
+                    for _, idx, total, src, tgt, action, err in msg[1]:
+                        if action == "error":
+                            lines.append(f"[{idx}/{total}] ERROR: {src} -> {err}\n")
+                        else:
+                            lines.append(f"[{idx}/{total}] {action}: {src} -> {tgt}\n")
+                    if lines:
+                        self._log_text.insert("end", "".join(lines))
+                        self._progress["maximum"] = max(total, 1)  # Grows while the scan is still running
+                        self._progress["value"] = idx
+                        self._log_text.see("end")
+                elif mtype == MSG_DONE:
+                    _, processed, errors = msg
                     self._log_text.insert("end", f"Done: processed={processed}, errors={errors}\n")
                     self._start_btn.config(state="normal")
                     self._stop_btn.config(state="disabled")
-                elif mtype == "error":
-                    self._log_text.insert("end", f"Error: {msg.get('msg')}\n")
+                elif mtype == MSG_ERR:
+                    self._log_text.insert("end", f"Error: {msg[1]}\n")
                     self._start_btn.config(state="normal")
                     self._stop_btn.config(state="disabled")
                 else:
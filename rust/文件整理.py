@@ -1,5 +1,6 @@
 
 import os
+import errno
 import shutil
 
 # File extensions
@@ -10,73 +11,110 @@ FILE_EXTENSIONS = {
     "office": ['.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.pdf', '.csv', '.txt'],
 }
 
+# Flattened lookup: {'.jpg': 'image', '.JPG': 'image', ...}
+# Upper-case variants are included so the usual all-lower/all-upper names need no .lower()
+EXTENSION_TO_CATEGORY = {
+    variant: category
+    for category in FILE_EXTENSIONS
+    for ext in FILE_EXTENSIONS[category]
+    for variant in (ext, ext.upper())
+}
+
 def get_file_type(filename):
-    extension = os.path.splitext(filename)[1].lower()
-    for category in FILE_EXTENSIONS:
-        for ext in FILE_EXTENSIONS[category]:
-            if extension == ext:
-                return category
-    return None
+    extension = os.path.splitext(filename)[1]
+    return EXTENSION_TO_CATEGORY.get(extension) or EXTENSION_TO_CATEGORY.get(extension.lower())
+
+def iter_categorized_files(root_directory, skip_directories=()):
+    # Yields (file path, category) for every classified file under root_directory,
+    # one os.scandir call per folder. Folders in skip_directories are not entered.
+    # Unreadable or vanished folders and entries are skipped, like os.walk does.
+    pending_directories = [root_directory]
+    while pending_directories:
+        found = []
+        try:
+            with os.scandir(pending_directories.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink() and entry.path not in skip_directories:
+                                pending_directories.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    file_type = get_file_type(entry.name)
+                    if file_type is not None:
+                        found.append((entry.path, file_type))
+        except OSError:
+            continue
+        # Yielded after the folder is closed, so errors from the caller's moves are not swallowed above
+        yield from found
 
-def count_files_and_collect_paths(root_directory):
-    stats = {
-        "image": 0,
-        "audio": 0,
-        "video": 0,
-        "office": 0,
-    }
-    file_paths = {
-        "image": [],
-        "audio": [],
-        "video": [],
-        "office": [],
-    }
-    for folder_path, folder_names, filenames in os.walk(root_directory):
-        for filename in filenames:
-            file_type = get_file_type(filename)
-            if file_type is not None:
-                full_file_path = os.path.join(folder_path, filename)
-                stats[file_type] += 1
-                file_paths[file_type].append(full_file_path)
-    return stats, file_paths
+def count_files(root_directory):
+    stats = {category: 0 for category in FILE_EXTENSIONS}
+    for _, file_type in iter_categorized_files(root_directory):
+        stats[file_type] += 1
+    return stats
 
 def print_statistics(stats):
     print("\nFile category statistics:")
     for category in stats:
         print(f"{category}: {stats[category]}")
 
-def get_non_duplicate_name(destination_directory, filename):
+def get_non_duplicate_name(destination_directory, filename, existing_names=None):
+    # existing_names: names already in destination_directory, listed once by the caller;
+    # checked instead of a stat per candidate and updated with the returned name
     base_name, extension = os.path.splitext(filename)
     counter = 1
     new_filename = filename
-    while os.path.exists(os.path.join(destination_directory, new_filename)):
+    if existing_names is None:
+        while os.path.exists(os.path.join(destination_directory, new_filename)):
+            new_filename = f"{base_name}_{counter}{extension}"
+            counter += 1
+        return new_filename
+    while new_filename.lower() in existing_names:
         new_filename = f"{base_name}_{counter}{extension}"
         counter += 1
+    existing_names.add(new_filename.lower())
     return new_filename
 
-def move_files(file_paths, root_directory):
-    for category in file_paths:
-        target_folder = os.path.join(root_directory, category)
-        if not os.path.exists(target_folder):
-            os.makedirs(target_folder)
-        for filepath in file_paths[category]:
-            filename = os.path.basename(filepath)
-            new_filename = get_non_duplicate_name(target_folder, filename)
-            new_file_path = os.path.join(target_folder, new_filename)
-            if filepath != new_file_path:
-                shutil.move(filepath, new_file_path)
+def organize_files(root_directory):
+    # Classifies and moves files in the same walk, so no list of paths is kept in memory.
+    # The category folders themselves are not walked: files moved there are not visited again.
+    target_folders = {category: os.path.join(root_directory, category) for category in FILE_EXTENSIONS}
+    existing_names_by_category = {}
+    stats = {category: 0 for category in FILE_EXTENSIONS}
+    for filepath, category in iter_categorized_files(root_directory, set(target_folders.values())):
+        target_folder = target_folders[category]
+        existing_names = existing_names_by_category.get(category)
+        if existing_names is None:
+            if not os.path.exists(target_folder):
+                os.makedirs(target_folder)
+            # Lower-cased so names differing only in case count as taken (Windows/macOS filesystems)
+            existing_names = {name.lower() for name in os.listdir(target_folder)}
+            existing_names_by_category[category] = existing_names
+        filename = os.path.basename(filepath)
+        new_filename = get_non_duplicate_name(target_folder, filename, existing_names)
+        new_file_path = os.path.join(target_folder, new_filename)
+        try:
+            os.replace(filepath, new_file_path)                     # Same filesystem: one atomic rename
+        except OSError as error:
+            if error.errno != errno.EXDEV:
+                raise
+            shutil.move(filepath, new_file_path)                    # Other device: copy, then delete
+        stats[category] += 1
+    return stats
 
 if __name__ == "__main__":
     root_directory = input("Input the folder path to organize: ").strip()
     if not os.path.isdir(root_directory):
         print("Invalid directory.")
         exit(1)
-    stats, file_paths = count_files_and_collect_paths(root_directory)
+    stats = count_files(root_directory)
     print_statistics(stats)
 
     answer = input("\nMove files to corresponding categorized folders? (y/n): ").strip().lower()
     if answer == 'y':
-        move_files(file_paths, root_directory)
+        organize_files(root_directory)
         print("File organization completed!")
     else:
         print("Operation cancelled.")
@@ -0,0 +1,28 @@
+"""WSGI entry point for the Flask file manager in 1简单文件管理.py.
+
+Run in production with Gunicorn and gevent workers, for example:
+    export SECRET_KEY=$(python -c 'import secrets; print(secrets.token_hex(32))')
+    gunicorn -k gevent -w $(nproc) -b 0.0.0.0:8000 --worker-connections 1000 wsgi:app
+
+Every worker process must sign sessions with the same SECRET_KEY, otherwise
+a cookie issued by one worker is rejected by the others.
+"""
+try:
+    from gevent import monkey  # Patch sockets/threads before anything else is imported
+    monkey.patch_all()
+except ImportError:
+    pass
+import os
+import importlib.util
+
+if not os.environ.get('SECRET_KEY'):
+    raise RuntimeError('Set the SECRET_KEY environment variable: it must be shared by all Gunicorn workers')
+
+# The app module name starts with a digit, so load it from its file path
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '1简单文件管理.py')
+spec = importlib.util.spec_from_file_location('simple_file_manager', APP_PATH)
+file_manager = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(file_manager)
+
+file_manager.init_db()
+app = file_manager.app
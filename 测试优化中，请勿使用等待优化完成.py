@@ -1,17 +1,22 @@
 import os  # Standard library: filesystem paths and directory operations
 import shutil  # Standard library: high-level file operations (move, rmtree)
 import uuid  # Standard library: UUID generation for stable share identifiers
+import threading  # Standard library: lock guarding the listing cache
+import gzip  # Standard library: precompressed static pages
+import hashlib  # Standard library: ETags for static pages
+import mimetypes  # Standard library: Content-Type for X-Accel-Redirect downloads
+from urllib.parse import quote  # Standard library: percent-encode internal redirect paths and filenames
 
-from functools import wraps  # Preserves function metadata when using decorators
+from functools import wraps, lru_cache  # Decorator metadata; memoized user directories
 from flask import (  # Flask web framework imports
     Flask,  # Main Flask application class
     request,  # HTTP request object (JSON, files, args)
+    Response,  # Raw HTTP response (cached JSON bodies)
     jsonify,  # Helper to return JSON responses
     send_file,  # Send files as HTTP responses
     session,  # Cookie-based session storage
     redirect,  # Redirect responses
-    url_for,  # Build URLs for endpoints
-    render_template_string  # Render HTML templates from strings
+    url_for  # Build URLs for endpoints
 )
 from flask_sqlalchemy import SQLAlchemy  # SQLAlchemy integration for Flask
 from werkzeug.utils import secure_filename  # Sanitize uploaded filenames
@@ -28,6 +33,13 @@ app.config["UPLOAD_FOLDER"] = UPLOAD_ROOT  # Configure upload root directory
 app.config["SECRET_KEY"] = "change_this_secret_key"  # Session signing key (change in production)
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + DATABASE_FILE  # SQLite database URI
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False  # Disable SQLAlchemy event system overhead
+# Let the front web server stream downloads; off by default, since the dev server cannot do this.
+#   SENDFILE_MODE=apache: X-Sendfile header (Apache mod_xsendfile, lighttpd)
+#   SENDFILE_MODE=nginx:  X-Accel-Redirect to an internal location mapped onto UPLOAD_ROOT, e.g.
+#     location /internal-uploads/ { internal; alias /abs/path/uploads/; }
+SENDFILE_MODE = os.environ.get("SENDFILE_MODE", "").lower()
+X_ACCEL_PREFIX = os.environ.get("X_ACCEL_PREFIX", "/internal-uploads/")  # nginx internal location
+app.config["USE_X_SENDFILE"] = SENDFILE_MODE == "apache"  # nginx ignores X-Sendfile
 
 db = SQLAlchemy(app)  # Initialize ORM with Flask app
 
@@ -50,6 +62,74 @@ with app.app_context():  # Ensure we have an app context for DB operations
     db.create_all()  # Create tables if they do not exist
 
 
+LISTING_CACHE = {}  # username -> (directory mtime_ns, JSON body) of the last /files response
+LISTING_CACHE_LOCK = threading.Lock()  # Requests may run on several threads
+
+
+def invalidate_file_listing(username):  # Drop a user's cached /files body after a change
+    with LISTING_CACHE_LOCK:
+        LISTING_CACHE.pop(username, None)  # Next /files call rescans
+
+
+def build_static_page(html):  # Precompute body, gzip body and ETag of a page that never changes
+    body = html.encode("utf-8")  # Plain body
+    etag = hashlib.blake2b(body, digest_size=8).hexdigest()  # Stable validator for this content
+    return body, gzip.compress(body), etag
+
+
+def static_page_response(page):  # Serve a build_static_page() result with ETag/304 and gzip
+    body, gzip_body, etag = page
+    use_gzip = request.accept_encodings["gzip"] > 0  # Client accepts gzip
+    if use_gzip:
+        etag += "-gz"  # Each encoding is its own representation
+    if request.if_none_match.contains(etag):  # Client already has this version
+        response = Response(status=304)  # Headers only
+    elif use_gzip:
+        response = Response(gzip_body, mimetype="text/html")  # Compressed once at import
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(body, mimetype="text/html")
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")  # Caches must key on the encoding
+    return response
+
+
+def save_upload(file_obj, dest):  # Write an uploaded file to dest
+    stream = file_obj.stream  # Werkzeug spools large uploads to a temporary file, small ones to memory
+    source_fd = None
+    # fileno() on a SpooledTemporaryFile still in memory would force it onto disk first,
+    # so only already rolled-over spools (and plain files) take the kernel-copy path
+    if getattr(stream, "_rolled", True):
+        try:
+            source_fd = stream.fileno()  # Only real files have one
+        except (AttributeError, OSError, ValueError):  # BytesIO raises io.UnsupportedOperation (an OSError/ValueError)
+            pass
+    with open(dest, "wb") as out:
+        if source_fd is not None and hasattr(os, "copy_file_range"):  # Linux: copy inside the kernel
+            try:
+                offset = 0
+                while True:
+                    copied = os.copy_file_range(source_fd, out.fileno(), 1 << 30, offset)  # Explicit source offset
+                    if copied == 0:
+                        return
+                    offset += copied
+            except OSError:  # e.g. EXDEV: temp dir on another filesystem type
+                out.seek(0)
+                out.truncate()
+                stream.seek(0)
+        shutil.copyfileobj(stream, out, 1 << 20)  # Portable path, 1 MiB chunks instead of Werkzeug's 16 KiB
+
+
+def send_user_file(file_abs, download_name):  # Send a file under UPLOAD_ROOT as an attachment
+    if SENDFILE_MODE == "nginx":  # Header only; nginx serves the bytes from its internal location
+        relative = os.path.relpath(file_abs, UPLOAD_ROOT).replace(os.sep, "/")  # Path below the alias
+        response = Response(mimetype=mimetypes.guess_type(download_name)[0] or "application/octet-stream")
+        response.headers["X-Accel-Redirect"] = X_ACCEL_PREFIX + quote(relative)
+        response.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+        return response
+    return send_file(file_abs, as_attachment=True, download_name=download_name, conditional=True)  # Send file (Range/ETag/304)
+
+
 def require_login(handler):  # Decorator to enforce login on routes
     @wraps(handler)  # Keep original function name/docs for Flask
     def wrapper(*args, **kwargs):  # Wrapper that checks session first
@@ -59,13 +139,23 @@ def require_login(handler):  # Decorator to enforce login on routes
     return wrapper  # Return decorated function
 
 
+@lru_cache(maxsize=1024)  # Created once per user per process; later calls skip the makedirs stat
+def user_directory(username):  # Create uploads/<username> and return its absolute path
+    user_dir = os.path.abspath(os.path.join(app.config["UPLOAD_FOLDER"], username))  # Path: uploads/<username>
+    os.makedirs(user_dir, exist_ok=True)  # Create directory if missing
+    return user_dir  # Return user directory path
+
+
 def ensure_user_directory(username=None):  # Get/create the user's storage directory
     current_username = username or session.get("username")  # Prefer explicit username, else from session
     if not current_username:  # If still missing (not logged in / invalid call)
         return None  # No directory can be resolved
-    user_dir = os.path.join(app.config["UPLOAD_FOLDER"], current_username)  # Path: uploads/<username>
-    os.makedirs(user_dir, exist_ok=True)  # Create directory if missing
-    return user_dir  # Return user directory path
+    return user_directory(current_username)  # Cached per username
+
+
+def recreate_user_directory():  # The cached folder vanished (e.g. deleted on disk): create it again
+    user_directory.cache_clear()  # lru_cache cannot drop a single key; the other users just miss once
+    return ensure_user_directory()  # makedirs runs again for this user
 
 
 def resolve_user_path(user_dir, user_input):  # Resolve a user-provided path safely under user_dir
@@ -116,7 +206,7 @@ def login():  # Handles login page and login submission
             return jsonify({"message": "Login success"})  # Return success JSON
         return jsonify({"error": "Invalid credentials"}), 403  # Unauthorized
 
-    return render_template_string(LOGIN_HTML)  # Render login page for GET
+    return static_page_response(LOGIN_PAGE)  # Pre-rendered login page for GET
 
 
 @app.route("/register", methods=["GET", "POST"])  # Register route
@@ -137,7 +227,7 @@ def register():  # Handles registration page and user creation
         db.session.commit()  # Persist to DB
         return jsonify({"message": "Register success"})  # Return success JSON
 
-    return render_template_string(REGISTER_HTML)  # Render register page for GET
+    return static_page_response(REGISTER_PAGE)  # Pre-rendered register page for GET
 
 
 @app.route("/logout", methods=["POST"])  # Logout route
@@ -149,18 +239,31 @@ def logout():  # Clears login session
 @app.route("/dashboard", methods=["GET"])  # Dashboard page route
 @require_login  # Require user to be logged in
 def dashboard():  # Render the main UI
-    return render_template_string(DASHBOARD_HTML, username=session["username"])  # Render dashboard with username
+    return DASHBOARD_TEMPLATE.render(username=session["username"])  # Render precompiled dashboard with username
 
 
 @app.route("/files", methods=["GET"])  # List files API
 @require_login  # Require user to be logged in
 def list_files():  # Return list of items in user directory
     user_dir = ensure_user_directory()  # Ensure user directory exists
-    items = []  # Response list
-    for name in sorted(os.listdir(user_dir)):  # List entries in the user directory
-        full_path = os.path.join(user_dir, name)  # Full path for each entry
-        items.append({"name": name, "type": "dir" if os.path.isdir(full_path) else "file"})  # Add name + type
-    return jsonify(items)  # Return JSON list
+    username = session["username"]  # Cache key
+    try:
+        mtime_ns = os.stat(user_dir).st_mtime_ns  # Changes whenever an entry is added, removed or renamed
+    except FileNotFoundError:
+        user_dir = recreate_user_directory()  # Folder removed behind the cache
+        mtime_ns = os.stat(user_dir).st_mtime_ns
+    with LISTING_CACHE_LOCK:
+        cached = LISTING_CACHE.get(username)  # Last listing, if any
+    if cached and cached[0] == mtime_ns:  # Folder unchanged since then
+        return Response(cached[1], mimetype="application/json")  # Serve the stored body, no rescan
+
+    with os.scandir(user_dir) as entries:  # One directory read; entries carry their type, no stat per entry
+        items = [{"name": entry.name, "type": "dir" if entry.is_dir() else "file"} for entry in entries]  # Name + type
+    items.sort(key=lambda item: item["name"])  # Same order as before (sorted by name)
+    response = jsonify(items)  # JSON list
+    with LISTING_CACHE_LOCK:
+        LISTING_CACHE[username] = (mtime_ns, response.get_data())  # Remember body for this folder state
+    return response  # Return JSON list
 
 
 @app.route("/upload", methods=["POST"])  # Upload API
@@ -179,7 +282,12 @@ def upload():  # Handle multipart/form upload
 
     user_dir = ensure_user_directory()  # Resolve user directory
     dest = os.path.join(user_dir, safe_name)  # Destination path
-    file_obj.save(dest)  # Save file to disk
+    try:
+        save_upload(file_obj, dest)  # Save file to disk
+    except FileNotFoundError:  # Folder removed behind the cache; nothing was read from the upload yet
+        dest = os.path.join(recreate_user_directory(), safe_name)
+        save_upload(file_obj, dest)
+    invalidate_file_listing(session["username"])  # Listing changed
     return jsonify({"message": "Upload success"})  # Success JSON
 
 
@@ -199,7 +307,7 @@ def download():  # Send a user file as attachment
     if not os.path.isfile(file_path):  # Ensure it's an existing file
         return jsonify({"error": "File not found"}), 404  # Not found
 
-    return send_file(file_path, as_attachment=True, download_name=os.path.basename(file_path))  # Send file
+    return send_user_file(file_path, os.path.basename(file_path))  # Send file (or hand it to the web server)
 
 
 @app.route("/delete", methods=["POST"])  # Delete API
@@ -215,13 +323,17 @@ def delete():  # Delete a file or folder
         target_abs, target_rel = resolve_user_path(user_dir, filename)  # Safely resolve path
     except ValueError:
         return jsonify({"error": "Invalid path"}), 400  # Reject traversal attempts
+    if target_abs == os.path.abspath(user_dir):  # e.g. "x/..": never delete the user's root folder
+        return jsonify({"error": "Invalid path"}), 400
 
     if os.path.isdir(target_abs):  # If target is a directory
         shutil.rmtree(target_abs)  # Delete directory recursively
+        invalidate_file_listing(session["username"])  # Listing changed
         return jsonify({"message": "Delete success"})  # Success JSON
 
     if os.path.isfile(target_abs):  # If target is a file
         os.remove(target_abs)  # Delete file
+        invalidate_file_listing(session["username"])  # Listing changed
 
         shared = SharedFile.query.filter_by(  # Find share record (if any)
             owner_username=session["username"],  # Must match current user
@@ -265,6 +377,7 @@ def move():  # Move or rename a file/folder within user's space
         shutil.move(source_abs, target_abs)  # Perform move/rename operation
     except Exception as exc:
         return jsonify({"error": f"Move failed: {exc}"}), 500  # Server error with message
+    invalidate_file_listing(session["username"])  # Listing changed
 
     shared = SharedFile.query.filter_by(  # If this file was shared, update share record
         owner_username=session["username"],  # Share must belong to current user
@@ -355,26 +468,33 @@ def download_shared(share_id):  # Download a shared file without login
     if not os.path.isfile(file_abs):  # Ensure file still exists
         return "File not found or unshared", 404  # Not found
 
-    return send_file(file_abs, as_attachment=True, download_name=record.display_name)  # Send file
+    return send_user_file(file_abs, record.display_name)  # Send file (or hand it to the web server)
 
 
 @app.route("/manage_shares", methods=["GET"])  # Shares management page
 @require_login  # Require user to be logged in
 def manage_shares():  # Render share management UI
-    return render_template_string(MANAGE_SHARES_HTML)  # Render template
+    return static_page_response(MANAGE_SHARES_PAGE)  # Pre-rendered page
 
 
 @app.route("/shares", methods=["GET"])  # Shares list API
 @require_login  # Require user to be logged in
 def shares_json():  # Return shares as JSON for management page
-    records = SharedFile.query.filter_by(owner_username=session["username"]).order_by(SharedFile.id.desc()).all()  # Query shares
-    response = []  # Prepare response list
-    for item in records:  # Convert records into JSON-serializable dicts
-        response.append({
-            "display_name": item.display_name,  # Display name
-            "relative_path": item.relative_path,  # Relative path
-            "share_url": build_share_url(item.share_id)  # Public URL
-        })
+    rows = (
+        db.session.query(SharedFile.display_name, SharedFile.relative_path, SharedFile.share_id)  # Only needed columns, no ORM objects
+        .filter_by(owner_username=session["username"])  # Current user's shares
+        .order_by(SharedFile.id.desc())  # Newest first
+        .all()
+    )
+    base_url = build_share_url("")  # Route built once; each link is base_url + share_id
+    response = [  # Convert rows into JSON-serializable dicts
+        {
+            "display_name": display_name,  # Display name
+            "relative_path": relative_path,  # Relative path
+            "share_url": base_url + share_id  # Public URL
+        }
+        for display_name, relative_path, share_id in rows
+    ]
     return jsonify(response)  # Return JSON list
 
 
@@ -843,6 +963,14 @@ loadShares();
 """
 
 
+# Templates are compiled once at import instead of re-parsed on every request.
+# Pages without template variables are rendered, gzipped and tagged once (see static_page_response).
+DASHBOARD_TEMPLATE = app.jinja_env.from_string(DASHBOARD_HTML)  # Needs username per request
+LOGIN_PAGE = build_static_page(app.jinja_env.from_string(LOGIN_HTML).render())  # Static
+REGISTER_PAGE = build_static_page(app.jinja_env.from_string(REGISTER_HTML).render())  # Static
+MANAGE_SHARES_PAGE = build_static_page(app.jinja_env.from_string(MANAGE_SHARES_HTML).render())  # Static
+
+
 if __name__ == "__main__":  # Only run the server when executed directly
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)  # Ensure upload root exists
     app.run(debug=True)  # Start Flask dev server with debug mode